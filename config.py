@@ -2,17 +2,18 @@
 # Configuration management for the ETL pipeline
 
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from typing import List, Optional
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DatabaseConfig:
     """Database configuration"""
     path: str = "singapore_companies.db"
     backup_path: str = "backups/"
     timeout: int = 30
+    batches_per_commit: int = 10  # Insert batches grouped into one transaction (one WAL sync)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ScrapingConfig:
     """Web scraping configuration"""
     request_timeout: int = 30
@@ -21,24 +22,30 @@ class ScrapingConfig:
     max_concurrent_requests: int = 5
     user_agent: str = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
     headless_browser: bool = True
+    use_selenium: bool = False  # Render pages whose static HTML has no body text in a browser
+    max_browsers: int = 2  # Headless browsers rendering JavaScript-only pages in parallel
+    parse_workers: int = 0  # Processes parsing scraped pages; 0 parses in threads
+    cache_dir: str = ".cache"  # Website search results and page validators kept across runs
+    use_cache: bool = True
     
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LLMConfig:
     """LLM configuration"""
-    model_name: str = "microsoft/DialoGPT-medium"
+    model_name: str = "valhalla/distilbart-mnli-12-3"
     max_tokens: int = 150
     temperature: float = 0.7
     device: str = "auto"  # auto, cpu, cuda
     batch_size: int = 4
+    quantization: str = "none"  # none, or opt-in 8bit/4bit (needs CUDA and bitsandbytes)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DataQualityConfig:
     """Data quality thresholds"""
     min_completeness_score: float = 50.0
     min_accuracy_score: float = 70.0
     fuzzy_match_threshold: int = 85
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ETLConfig:
     """ETL pipeline configuration"""
     target_company_count: int = 10000
@@ -46,16 +53,12 @@ class ETLConfig:
     max_workers: int = 4
     enable_llm_enrichment: bool = True
     enable_website_scraping: bool = True
-    data_sources: List[str] = None
-    
-    def __post_init__(self):
-        if self.data_sources is None:
-            self.data_sources = [
-                "acra",
-                "bizfile", 
-                "data_gov_sg",
-                "company_websites"
-            ]
+    data_sources: List[str] = field(default_factory=lambda: [
+        "acra",
+        "bizfile", 
+        "data_gov_sg",
+        "company_websites"
+    ])
 
 class Config:
     """Main configuration class"""
@@ -72,18 +75,30 @@ class Config:
     
     def _load_from_env(self):
         """Load configuration from environment variables"""
+        # Sections are frozen, so overrides build replacement instances
+        
         # Database config
-        self.database.path = os.getenv("DB_PATH", self.database.path)
+        self.database = replace(
+            self.database,
+            path=os.getenv("DB_PATH", self.database.path)
+        )
         
         # LLM config
-        self.llm.model_name = os.getenv("LLM_MODEL", self.llm.model_name)
-        self.llm.device = os.getenv("LLM_DEVICE", self.llm.device)
+        self.llm = replace(
+            self.llm,
+            model_name=os.getenv("LLM_MODEL", self.llm.model_name),
+            device=os.getenv("LLM_DEVICE", self.llm.device),
+            quantization=os.getenv("LLM_QUANTIZATION", self.llm.quantization)
+        )
         
         # ETL config
-        self.etl.target_company_count = int(
-            os.getenv("TARGET_COMPANY_COUNT", self.etl.target_company_count)
+        self.etl = replace(
+            self.etl,
+            target_company_count=int(
+                os.getenv("TARGET_COMPANY_COUNT", self.etl.target_company_count)
+            ),
+            batch_size=int(os.getenv("BATCH_SIZE", self.etl.batch_size))
         )
-        self.etl.batch_size = int(os.getenv("BATCH_SIZE", self.etl.batch_size))
 
 # Global configuration instance
 config = Config()
\ No newline at end of file
@@ -3,24 +3,119 @@
 
 import sqlite3
 import logging
+import json
+from contextlib import contextmanager
+from operator import attrgetter
 from pathlib import Path
 from typing import List, Dict, Optional
-import pandas as pd
-from models import CompanyData
+from models import COMPANY_FIELDS, CompanyData
+
+# orjson parses and serializes JSON several times faster than the stdlib
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Dumps return str: bound as bytes, SQLite would read the parameter as a BLOB, not JSON text
+if ORJSON_AVAILABLE:
+    _json_loads, _json_dumps = orjson.loads, lambda obj: orjson.dumps(obj).decode('utf-8')
+else:
+    _json_loads, _json_dumps = json.loads, json.dumps
 
 logger = logging.getLogger(__name__)
 
+# companies columns written by the insert methods, in bind order: every CompanyData
+# field except the extraction metadata, which the table does not store
+_COMPANY_COLUMNS = tuple(
+    field for field in COMPANY_FIELDS if field not in ('source_of_data', 'extraction_timestamp')
+)
+_get_company_row = attrgetter(*_COMPANY_COLUMNS)
+
 class DatabaseManager:
     """Handles all database operations"""
     
+    # Built once so SQLite's statement cache reuses the compiled form
+    _INSERT_SQL = f'''
+    INSERT INTO companies ({', '.join(_COMPANY_COLUMNS)})
+    VALUES ({', '.join('?' * len(_COMPANY_COLUMNS))})
+    ON CONFLICT(uen) DO UPDATE SET
+        {', '.join(f'{column} = excluded.{column}' for column in _COMPANY_COLUMNS if column != 'uen')},
+        updated_at = CURRENT_TIMESTAMP
+    '''
+    
+    _SECONDARY_INDEXES = {
+        'idx_company_name': 'CREATE INDEX IF NOT EXISTS idx_company_name ON companies(company_name)',
+        'idx_website': 'CREATE INDEX IF NOT EXISTS idx_website ON companies(website)',
+        # Partial index keeps the top-industries aggregation an index-only scan
+        'idx_industry_partial': (
+            'CREATE INDEX IF NOT EXISTS idx_industry_partial ON companies(industry) '
+            'WHERE industry IS NOT NULL'
+        ),
+    }
+    
+    # Loads adding at least this share of the existing rows rebuild the indexes afterwards;
+    # smaller top-ups maintain them in place
+    _INDEX_REBUILD_MIN_SHARE = 0.5
+    
+    # Share of key fields populated, scaled to 0-100
+    _QUALITY_SCORE_SQL = '''
+    UPDATE companies SET data_quality_score = (
+        CASE WHEN uen IS NOT NULL THEN 1 ELSE 0 END +
+        CASE WHEN company_name IS NOT NULL THEN 1 ELSE 0 END +
+        CASE WHEN website IS NOT NULL THEN 1 ELSE 0 END +
+        CASE WHEN linkedin IS NOT NULL THEN 1 ELSE 0 END +
+        CASE WHEN industry IS NOT NULL THEN 1 ELSE 0 END +
+        CASE WHEN contact_email IS NOT NULL THEN 1 ELSE 0 END +
+        CASE WHEN contact_phone IS NOT NULL THEN 1 ELSE 0 END +
+        CASE WHEN founding_year IS NOT NULL THEN 1 ELSE 0 END +
+        CASE WHEN number_of_employees IS NOT NULL THEN 1 ELSE 0 END +
+        CASE WHEN services_offered IS NOT NULL THEN 1 ELSE 0 END
+    ) / 10.0 * 100.0
+    '''
+    
     def __init__(self, db_path: str = "singapore_companies.db"):
         self.db_path = db_path
-        self.create_tables()
+        
+        # Persistent connection; transactions are managed explicitly with BEGIN/COMMIT
+        self.conn = sqlite3.connect(
+            db_path,
+            cached_statements=128,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        self._apply_pragmas()
+        self.create_tables_minimal()
+        
+        # Separate read-only connection for reports so WAL readers never contend with the writer
+        self.ro_conn = sqlite3.connect(
+            f"{Path(db_path).resolve().as_uri()}?mode=ro",
+            uri=True,
+            cached_statements=128,
+            check_same_thread=False
+        )
     
-    def create_tables(self):
-        """Create database tables with proper schema"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def _apply_pragmas(self):
+        """Tune SQLite for bulk writes"""
+        # Page size only takes effect before the first table is created (and never in WAL mode)
+        is_new_database = self.conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0] == 0
+        if is_new_database:
+            self.conn.execute("PRAGMA page_size=8192")  # Wide company rows fit more per page
+        
+        journal_mode = self.conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        if journal_mode.lower() != 'wal':
+            logger.warning(f"WAL journal mode not available, using {journal_mode}")
+        
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA cache_size=-65536")  # 64 MB page cache
+        self.conn.execute("PRAGMA mmap_size=1073741824")  # 1 GB memory map
+    
+    def create_tables_minimal(self):
+        """Create database tables with only the indexes needed during ingest"""
+        # Schema changes run on the manager's own connection, in one transaction
+        cursor = self.conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
         
         # Main companies table
         cursor.execute('''
@@ -65,174 +160,204 @@ class DatabaseManager:
         )
         ''')
         
-        # Create indexes for better performance
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_uen ON companies(uen)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_company_name ON companies(company_name)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_website ON companies(website)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_industry ON companies(industry)')
+        # uen is served by its UNIQUE autoindex; secondary indexes are built after loading
+        cursor.execute('DROP INDEX IF EXISTS idx_uen')
+        cursor.execute('DROP INDEX IF EXISTS idx_industry')  # Superseded by idx_industry_partial
+        
+        # Quality scores are computed set-based after each insert instead of per-row
+        cursor.execute('DROP TRIGGER IF EXISTS calculate_data_quality_score')
         
-        # Create trigger for data quality score calculation
+        # Row counter kept in step with companies so counting is O(1)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS company_counter (
+            n INTEGER NOT NULL
+        )
+        ''')
+        cursor.execute('''
+        INSERT INTO company_counter (n)
+        SELECT COUNT(*) FROM companies
+        WHERE NOT EXISTS (SELECT 1 FROM company_counter)
+        ''')
+        cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS company_counter_insert
+            AFTER INSERT ON companies
+        BEGIN
+            UPDATE company_counter SET n = n + 1;
+        END;
+        ''')
         cursor.execute('''
-        CREATE TRIGGER IF NOT EXISTS calculate_data_quality_score
-            AFTER INSERT OR UPDATE ON companies
-            FOR EACH ROW
+        CREATE TRIGGER IF NOT EXISTS company_counter_delete
+            AFTER DELETE ON companies
         BEGIN
-            UPDATE companies SET data_quality_score = (
-                CASE WHEN NEW.uen IS NOT NULL THEN 1 ELSE 0 END +
-                CASE WHEN NEW.company_name IS NOT NULL THEN 1 ELSE 0 END +
-                CASE WHEN NEW.website IS NOT NULL THEN 1 ELSE 0 END +
-                CASE WHEN NEW.linkedin IS NOT NULL THEN 1 ELSE 0 END +
-                CASE WHEN NEW.industry IS NOT NULL THEN 1 ELSE 0 END +
-                CASE WHEN NEW.contact_email IS NOT NULL THEN 1 ELSE 0 END +
-                CASE WHEN NEW.contact_phone IS NOT NULL THEN 1 ELSE 0 END +
-                CASE WHEN NEW.founding_year IS NOT NULL THEN 1 ELSE 0 END +
-                CASE WHEN NEW.number_of_employees IS NOT NULL THEN 1 ELSE 0 END +
-                CASE WHEN NEW.services_offered IS NOT NULL THEN 1 ELSE 0 END
-            ) / 10.0 * 100.0
-            WHERE id = NEW.id;
+            UPDATE company_counter SET n = n - 1;
         END;
         ''')
         
-        conn.commit()
-        conn.close()
+        cursor.execute("COMMIT")
         logger.info("Database tables created successfully")
     
+    def create_secondary_indexes(self):
+        """Create lookup indexes in one pass over the loaded table"""
+        for index_sql in self._SECONDARY_INDEXES.values():
+            self.conn.execute(index_sql)
+        logger.info("Secondary indexes created")
+    
+    def drop_secondary_indexes(self):
+        """Drop lookup indexes so a bulk load skips per-row index maintenance"""
+        for index_name in self._SECONDARY_INDEXES:
+            self.conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+    
+    def bulk_load_rebuilds_indexes(self, incoming_rows: Optional[int]) -> bool:
+        """Whether a load of incoming_rows (None if unknown) should drop and rebuild the lookup indexes"""
+        existing_rows = self.get_company_count()
+        if existing_rows == 0:
+            return True
+        return incoming_rows is not None and incoming_rows >= existing_rows * self._INDEX_REBUILD_MIN_SHARE
+    
+    def finalize_indexes(self):
+        """Build secondary indexes and refresh planner statistics once the bulk load has finished"""
+        self.create_secondary_indexes()
+        self.analyze()
+    
+    def analyze(self):
+        """Populate sqlite_stat1 so the query planner picks indexes from real data distribution"""
+        self.conn.execute("ANALYZE")
+        logger.info("Database statistics updated")
+    
     def insert_company(self, company: CompanyData) -> int:
         """Insert or update a company record"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute('''
-            INSERT OR REPLACE INTO companies (
-                uen, company_name, website, hq_country, no_of_locations_in_singapore,
-                linkedin, facebook, instagram, industry, number_of_employees,
-                company_size, is_it_delisted, stock_exchange_code, revenue,
-                founding_year, contact_email, contact_phone, products_offered,
-                services_offered, keywords
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                company.uen, company.company_name, company.website,
-                company.hq_country, company.no_of_locations_in_singapore,
-                company.linkedin, company.facebook, company.instagram,
-                company.industry, company.number_of_employees,
-                company.company_size, company.is_it_delisted,
-                company.stock_exchange_code, company.revenue,
-                company.founding_year, company.contact_email,
-                company.contact_phone, company.products_offered,
-                company.services_offered, company.keywords
-            ))
-            
+            self.conn.execute("BEGIN IMMEDIATE")
+            cursor = self.conn.execute(self._INSERT_SQL, _get_company_row(company))
             company_id = cursor.lastrowid
-            conn.commit()
+            if company.uen is not None:
+                # lastrowid is not set when the upsert updates an existing row
+                company_id = self.conn.execute(
+                    "SELECT id FROM companies WHERE uen = ?", (company.uen,)
+                ).fetchone()[0]
+            self.conn.execute(self._QUALITY_SCORE_SQL + " WHERE id = ?", (company_id,))
+            self.conn.execute("COMMIT")
             return company_id
             
         except Exception as e:
             logger.error(f"Error inserting company {company.company_name}: {e}")
-            conn.rollback()
+            if self.conn.in_transaction:
+                self.conn.execute("ROLLBACK")
             return None
-        finally:
-            conn.close()
     
     def insert_companies_batch(self, companies: List[CompanyData]) -> int:
-        """Insert multiple companies in batch"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Insert multiple companies in a single transaction"""
+        rows = list(map(_get_company_row, companies))
         
-        inserted_count = 0
+        # Inside a caller's transaction() the batch becomes a savepoint of it
+        nested = self.conn.in_transaction
         
         try:
-            for company in companies:
-                cursor.execute('''
-                INSERT OR REPLACE INTO companies (
-                    uen, company_name, website, hq_country, no_of_locations_in_singapore,
-                    linkedin, facebook, instagram, industry, number_of_employees,
-                    company_size, is_it_delisted, stock_exchange_code, revenue,
-                    founding_year, contact_email, contact_phone, products_offered,
-                    services_offered, keywords
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    company.uen, company.company_name, company.website,
-                    company.hq_country, company.no_of_locations_in_singapore,
-                    company.linkedin, company.facebook, company.instagram,
-                    company.industry, company.number_of_employees,
-                    company.company_size, company.is_it_delisted,
-                    company.stock_exchange_code, company.revenue,
-                    company.founding_year, company.contact_email,
-                    company.contact_phone, company.products_offered,
-                    company.services_offered, company.keywords
-                ))
-                inserted_count += 1
+            # One explicit transaction and one compiled statement for the whole batch
+            self.conn.execute("SAVEPOINT insert_batch" if nested else "BEGIN IMMEDIATE")
+            last_id = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM companies").fetchone()[0]
+            cursor = self.conn.executemany(self._INSERT_SQL, rows)
+            inserted_count = cursor.rowcount
+            
+            # Score only this batch's rows: new ids plus upserted UENs, both index lookups
+            batch_uens = _json_dumps([company.uen for company in companies if company.uen is not None])
+            self.conn.execute(
+                self._QUALITY_SCORE_SQL + " WHERE id > ? OR uen IN (SELECT value FROM json_each(?))",
+                (last_id, batch_uens)
+            )
+            self.conn.execute("RELEASE insert_batch" if nested else "COMMIT")
             
-            conn.commit()
             logger.info(f"Successfully inserted {inserted_count} companies")
             return inserted_count
             
         except Exception as e:
             logger.error(f"Error in batch insert: {e}")
-            conn.rollback()
+            if nested:
+                self.conn.execute("ROLLBACK TO insert_batch")
+                self.conn.execute("RELEASE insert_batch")
+            elif self.conn.in_transaction:
+                self.conn.execute("ROLLBACK")
             return 0
-        finally:
-            conn.close()
+    
+    @contextmanager
+    def transaction(self):
+        """Group several insert_companies_batch calls into one transaction"""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            if self.conn.in_transaction:
+                self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
     
     def get_company_count(self) -> int:
         """Get total number of companies in database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+        # WAL mode lets this read run alongside an in-progress batch insert
         try:
-            cursor.execute("SELECT COUNT(*) FROM companies")
-            count = cursor.fetchone()[0]
-            return count
+            return self.ro_conn.execute("SELECT n FROM company_counter").fetchone()[0]
         except Exception as e:
             logger.error(f"Error getting company count: {e}")
             return 0
-        finally:
-            conn.close()
     
     def get_data_coverage_report(self) -> Dict:
         """Generate data coverage report"""
-        conn = sqlite3.connect(self.db_path)
-        
+        # Reads see the last committed snapshot under WAL without blocking writers
         try:
-            # Basic statistics
-            total_companies = pd.read_sql("SELECT COUNT(*) as count FROM companies", conn).iloc[0]['count']
-            
-            # Coverage analysis
-            coverage_query = '''
-            SELECT 
-                SUM(CASE WHEN website IS NOT NULL THEN 1 ELSE 0 END) * 100.0 / COUNT(*) as website_coverage,
-                SUM(CASE WHEN linkedin IS NOT NULL THEN 1 ELSE 0 END) * 100.0 / COUNT(*) as linkedin_coverage,
-                SUM(CASE WHEN contact_email IS NOT NULL THEN 1 ELSE 0 END) * 100.0 / COUNT(*) as email_coverage,
-                SUM(CASE WHEN industry IS NOT NULL THEN 1 ELSE 0 END) * 100.0 / COUNT(*) as industry_coverage,
-                AVG(data_quality_score) as avg_quality_score
-            FROM companies
-            '''
-            
-            coverage_data = pd.read_sql(coverage_query, conn)
+            # Scalar coverage metrics and top industries in a single round trip
+            coverage_json, top_industries_json = self.ro_conn.execute('''
+            WITH stats AS (
+                SELECT 
+                    COUNT(*) as total,
+                    SUM(CASE WHEN website IS NOT NULL THEN 1 ELSE 0 END) as website_count,
+                    SUM(CASE WHEN linkedin IS NOT NULL THEN 1 ELSE 0 END) as linkedin_count,
+                    SUM(CASE WHEN contact_email IS NOT NULL THEN 1 ELSE 0 END) as email_count,
+                    SUM(CASE WHEN industry IS NOT NULL THEN 1 ELSE 0 END) as industry_count,
+                    AVG(data_quality_score) as avg_quality_score
+                FROM companies
+            ),
+            top AS (
+                SELECT industry, COUNT(*) as company_count 
+                FROM companies 
+                WHERE industry IS NOT NULL 
+                GROUP BY industry 
+                ORDER BY company_count DESC 
+                LIMIT 5
+            )
+            SELECT
+                (SELECT json_object(
+                    'total_companies', total,
+                    'website_coverage', COALESCE(website_count * 100.0 / NULLIF(total, 0), 0.0),
+                    'linkedin_coverage', COALESCE(linkedin_count * 100.0 / NULLIF(total, 0), 0.0),
+                    'email_coverage', COALESCE(email_count * 100.0 / NULLIF(total, 0), 0.0),
+                    'industry_coverage', COALESCE(industry_count * 100.0 / NULLIF(total, 0), 0.0),
+                    'avg_quality_score', COALESCE(avg_quality_score, 0.0)
+                ) FROM stats),
+                (SELECT json_group_array(json_object(
+                    'industry', industry,
+                    'company_count', company_count
+                )) FROM top)
+            ''').fetchone()
             
-            # Top industries
-            top_industries = pd.read_sql('''
-            SELECT industry, COUNT(*) as company_count 
-            FROM companies 
-            WHERE industry IS NOT NULL 
-            GROUP BY industry 
-            ORDER BY company_count DESC 
-            LIMIT 5
-            ''', conn)
+            coverage = _json_loads(coverage_json)
+            total_companies = coverage.pop('total_companies')
             
             return {
                 'total_companies': total_companies,
-                'coverage': coverage_data.iloc[0].to_dict(),
-                'top_industries': top_industries.to_dict('records')
+                'coverage': coverage,
+                'top_industries': _json_loads(top_industries_json)
             }
             
         except Exception as e:
             logger.error(f"Error generating coverage report: {e}")
             return {}
-        finally:
-            conn.close()
     
     def close(self):
         """Close database connection"""
-        pass  # Using context managers, so explicit close not needed
\ No newline at end of file
+        if self.ro_conn is not None:
+            self.ro_conn.close()
+            self.ro_conn = None
+        if self.conn is not None:
+            self.conn.execute("PRAGMA optimize")
+            self.conn.close()
+            self.conn = None
\ No newline at end of file
@@ -1,17 +1,57 @@
 # data_extractor.py
 # Data extraction from various Singapore government sources
 
+import asyncio
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import logging
+import re
+import sqlite3
 import time
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
-import csv
-import io
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from config import config
+
+# orjson parses JSON several times faster than the stdlib
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+# Async HTTP for website probing
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+    logging.warning("aiohttp not available. Website search will not probe domains.")
 
 logger = logging.getLogger(__name__)
 
+# Data.gov.sg resource ids (CKAN UUIDs or the newer d_<hex> form); checked before being put in SQL
+_RESOURCE_ID_RE = re.compile(r'(?:d_)?[0-9a-f-]+')
+
+# Company name -> DNS label: drop qualifiers like "(S)", then trailing legal forms
+# ("pte. ltd.", "ltd", "llp", ...), then every character a hostname label cannot hold
+_NAME_QUALIFIER_RE = re.compile(r'\([^)]*\)')
+_LEGAL_SUFFIX_RE = re.compile(
+    r'(?:(?:^|[\s,]+)(?:pte|private|ltd|limited|llp|llc|inc|incorporated|corp|corporation|co|company)\.?)+$'
+)
+_NON_LABEL_RE = re.compile(r'[^a-z0-9]+')
+_MAX_LABEL_LENGTH = 63
+
+# In-process website search results kept before the oldest are evicted
+_WEBSITE_CACHE_MAX_ENTRIES = 100_000
+
 class SGDataExtractor:
     """Handles data extraction from various Singapore government sources"""
     
@@ -23,10 +63,69 @@ class SGDataExtractor:
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Singapore-Company-ETL/1.0 (Educational Purpose)',
-            'Accept': 'application/json'
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate'
         })
+        
+        # Pooled keep-alive connections with retry/backoff on transient errors
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504]
+            )
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # Website search results by normalized name (None = nothing found), backed by SQLite
+        self._website_cache: Dict[str, Optional[str]] = {}
+        self._website_cache_conn: Optional[sqlite3.Connection] = None
+        self.website_cache_stats = {'hits': 0, 'misses': 0}
+        
+        # Government CSV column -> pipeline field
+        self.csv_field_mapping = {
+            'uen': 'uen',
+            'entity_name': 'company_name',
+            'entity_type': 'company_type',
+            'primary_ssic_code': 'primary_ssic_code',
+            'primary_ssic_description': 'primary_ssic_description',
+            'reg_street_name': 'reg_street_name',
+            'reg_postal_code': 'reg_postal_code',
+            'incorporation_date': 'incorporation_date',
+            'entity_status': 'company_status'
+        }
+        
+        # Common Singapore domain patterns, most likely first
+        self.domain_patterns = [
+            "https://www.{name}.com.sg",
+            "https://www.{name}.sg",
+            "https://{name}.com",
+            "https://www.{name}.com"
+        ]
+        
+        # SSIC code -> description for generated sample data
+        self.sample_industries = [
+            ('62010', 'Computer programming activities'),
+            ('56101', 'Restaurants'),
+            ('64110', 'Central banking'),
+            ('85100', 'Pre-primary education'),
+            ('68100', 'Buying and selling of own real estate'),
+            ('49100', 'Land transport of passengers'),
+            ('47110', 'Retail sale in non-specialised stores with food predominating'),
+            ('70100', 'Activities of head offices'),
+            ('86901', 'General medical practice'),
+            ('25110', 'Manufacture of structural metal products')
+        ]
+        
+        # Resolve name patterns once per SSIC code instead of on every generated name
+        self._ssic_to_patterns = {
+            code: self._get_name_patterns(desc) for code, desc in self.sample_industries
+        }
     
-    def extract_companies_from_data_gov(self, limit: int = 1000) -> List[Dict]:
+    def extract_companies_from_data_gov(self, limit: int = 1000, resource_id: str = None) -> List[Dict]:
         """
         Extract company data from Singapore's Data.gov.sg
         
@@ -40,40 +139,18 @@ class SGDataExtractor:
         try:
             logger.info("Extracting companies from Data.gov.sg...")
             
-            # Example API structure for ACRA data (you need to replace with actual endpoints)
             # Real implementation would use: https://data.gov.sg/dataset/acra-information-on-corporate-entities
+            if resource_id:
+                df = self._fetch_data_gov_records(resource_id, limit)
+            else:
+                # For demonstration, we'll simulate the data structure
+                df = self._simulate_data_gov_records(min(limit, 1000))
             
-            # For demonstration, we'll simulate the data structure
-            # In reality, you would make actual API calls like:
-            # response = self.session.get(f"{self.base_urls['data_gov_sg']}/action/datastore_search", 
-            #                           params={'resource_id': 'actual_resource_id', 'limit': limit})
+            df['source'] = 'data_gov_sg'
+            df['extraction_timestamp'] = datetime.now().isoformat()
             
-            # Simulated data structure based on actual ACRA format
-            for i in range(min(limit, 1000)):
-                company = {
-                    'uen': f'20{1000000000 + i:010d}A',  # Simulated UEN format
-                    'company_name': f'Singapore Company {i+1} Pte Ltd',
-                    'reg_street_name': f'Street {i+1}',
-                    'reg_postal_code': f'{100000 + i:06d}',
-                    'company_type': 'PRIVATE COMPANY LIMITED BY SHARES',
-                    'primary_ssic_code': '62010',  # Computer programming activities
-                    'primary_ssic_description': 'Computer programming activities',
-                    'secondary_ssic_code': None,
-                    'incorporation_date': '2020-01-15',
-                    'company_status': 'Live Company',
-                    'source': 'data_gov_sg',
-                    'extraction_timestamp': datetime.now().isoformat()
-                }
-                companies.append(company)
-                
-                # Add some variety to the data
-                if i % 10 == 0:
-                    company['company_name'] = f'Tech Solutions {i+1} Pte Ltd'
-                    company['primary_ssic_description'] = 'Information technology consultancy activities'
-                elif i % 15 == 0:
-                    company['company_name'] = f'Food & Beverage {i+1} Pte Ltd'
-                    company['primary_ssic_description'] = 'Restaurants'
-                    company['primary_ssic_code'] = '56101'
+            # Convert to plain dicts only at the boundary
+            companies = df.to_dict('records')
                 
         except Exception as e:
             logger.error(f"Error extracting from Data.gov.sg: {e}")
@@ -81,6 +158,51 @@ class SGDataExtractor:
         logger.info(f"Extracted {len(companies)} companies from Data.gov.sg")
         return companies
     
+    def _fetch_data_gov_records(self, resource_id: str, limit: int) -> pd.DataFrame:
+        """Fetch records in one round trip via the datastore_search_sql bulk endpoint"""
+        # The id is interpolated into SQL, so anything but a well-formed id is rejected
+        if not _RESOURCE_ID_RE.fullmatch(resource_id):
+            raise ValueError(f"Invalid Data.gov.sg resource id: {resource_id!r}")
+        
+        response = self.session.get(
+            f"{self.base_urls['data_gov_sg']}/action/datastore_search_sql",
+            params={'sql': f'SELECT * FROM "{resource_id}" LIMIT {int(limit)}'},
+            timeout=60
+        )
+        response.raise_for_status()
+        
+        df = pd.DataFrame.from_records(_json_loads(response.content)['result']['records'])
+        return df.rename(columns={'entity_name': 'company_name', 'entity_status': 'company_status'})
+    
+    def _simulate_data_gov_records(self, count: int) -> pd.DataFrame:
+        """Build simulated records based on the actual ACRA format"""
+        idx = pd.RangeIndex(count)
+        number = (idx + 1).astype(str)
+        
+        df = pd.DataFrame({
+            'uen': '20' + (1000000000 + idx).astype(str).str.zfill(10) + 'A',  # Simulated UEN format
+            'company_name': 'Singapore Company ' + number + ' Pte Ltd',
+            'reg_street_name': 'Street ' + number,
+            'reg_postal_code': (100000 + idx).astype(str).str.zfill(6),
+            'company_type': 'PRIVATE COMPANY LIMITED BY SHARES',
+            'primary_ssic_code': '62010',  # Computer programming activities
+            'primary_ssic_description': 'Computer programming activities',
+            'secondary_ssic_code': pd.Series([None] * count, dtype=object),
+            'incorporation_date': '2020-01-15',
+            'company_status': 'Live Company',
+        })
+        
+        # Add some variety to the data
+        tech = idx % 10 == 0
+        food = (idx % 15 == 0) & ~tech
+        df.loc[tech, 'company_name'] = 'Tech Solutions ' + number[tech] + ' Pte Ltd'
+        df.loc[tech, 'primary_ssic_description'] = 'Information technology consultancy activities'
+        df.loc[food, 'company_name'] = 'Food & Beverage ' + number[food] + ' Pte Ltd'
+        df.loc[food, 'primary_ssic_description'] = 'Restaurants'
+        df.loc[food, 'primary_ssic_code'] = '56101'
+        
+        return df
+    
     def extract_companies_from_csv_sources(self, csv_url: str = None) -> List[Dict]:
         """
         Extract company data from CSV sources
@@ -96,28 +218,27 @@ class SGDataExtractor:
                 return self._generate_sample_csv_data(500)
             
             logger.info(f"Downloading CSV from: {csv_url}")
-            response = self.session.get(csv_url, timeout=30)
+            response = self.session.get(csv_url, stream=True, timeout=30)
             response.raise_for_status()
+            response.raw.decode_content = True
             
-            # Parse CSV content
-            csv_content = io.StringIO(response.text)
-            reader = csv.DictReader(csv_content)
+            # Stream the CSV through pandas' C parser in fixed-size chunks
+            extraction_timestamp = datetime.now().isoformat()
+            reader = pd.read_csv(
+                response.raw,
+                chunksize=10_000,
+                usecols=lambda column: column in self.csv_field_mapping,
+                dtype=str,
+                keep_default_na=False
+            )
             
-            for row in reader:
-                company = {
-                    'uen': row.get('uen'),
-                    'company_name': row.get('entity_name'),
-                    'company_type': row.get('entity_type'),
-                    'primary_ssic_code': row.get('primary_ssic_code'),
-                    'primary_ssic_description': row.get('primary_ssic_description'),
-                    'reg_street_name': row.get('reg_street_name'),
-                    'reg_postal_code': row.get('reg_postal_code'),
-                    'incorporation_date': row.get('incorporation_date'),
-                    'company_status': row.get('entity_status'),
-                    'source': 'csv_download',
-                    'extraction_timestamp': datetime.now().isoformat()
-                }
-                companies.append(company)
+            for chunk in reader:
+                chunk = chunk.reindex(columns=list(self.csv_field_mapping))
+                chunk = chunk.astype(object).where(chunk.notna(), None)
+                chunk = chunk.rename(columns=self.csv_field_mapping)
+                chunk['source'] = 'csv_download'
+                chunk['extraction_timestamp'] = extraction_timestamp
+                companies.extend(chunk.to_dict('records'))
                 
         except Exception as e:
             logger.error(f"Error extracting from CSV source: {e}")
@@ -127,18 +248,7 @@ class SGDataExtractor:
     
     def _generate_sample_csv_data(self, count: int) -> List[Dict]:
         """Generate sample data for demonstration purposes"""
-        industries = [
-            ('62010', 'Computer programming activities'),
-            ('56101', 'Restaurants'),
-            ('64110', 'Central banking'),
-            ('85100', 'Pre-primary education'),
-            ('68100', 'Buying and selling of own real estate'),
-            ('49100', 'Land transport of passengers'),
-            ('47110', 'Retail sale in non-specialised stores with food predominating'),
-            ('70100', 'Activities of head offices'),
-            ('86901', 'General medical practice'),
-            ('25110', 'Manufacture of structural metal products')
-        ]
+        industries = self.sample_industries
         
         company_types = [
             'PRIVATE COMPANY LIMITED BY SHARES',
@@ -148,30 +258,42 @@ class SGDataExtractor:
             'SOCIETY'
         ]
         
-        companies = []
-        for i in range(count):
-            industry = industries[i % len(industries)]
-            company_type = company_types[i % len(company_types)]
-            
-            company = {
-                'uen': f'20{1000000000 + i:010d}A',
-                'company_name': f'{self._generate_company_name(i, industry[1])}',
-                'company_type': company_type,
-                'primary_ssic_code': industry[0],
-                'primary_ssic_description': industry[1],
-                'reg_street_name': f'Street {i+1}',
-                'reg_postal_code': f'{100000 + (i % 900000):06d}',
-                'incorporation_date': f'20{10 + (i % 15)}-{1 + (i % 12):02d}-{1 + (i % 28):02d}',
-                'company_status': 'Live Company' if i % 20 != 0 else 'Struck Off',
-                'source': 'sample_data',
-                'extraction_timestamp': datetime.now().isoformat()
-            }
-            companies.append(company)
+        if count <= 0:
+            return []
         
-        return companies
+        # Build every column as an array instead of one dict per row
+        idx = np.arange(count)
+        number = (idx + 1).astype(str).astype(object)
+        industry_idx = idx % len(industries)
+        
+        pattern_names = np.empty(count, dtype=object)
+        for k, (ssic_code, _) in enumerate(industries):
+            rows = np.flatnonzero(industry_idx == k)
+            patterns = np.array(self._ssic_to_patterns[ssic_code], dtype=object)
+            pattern_names[rows] = patterns[rows % len(patterns)]
+        
+        df = pd.DataFrame({
+            'uen': '20' + np.char.zfill((1000000000 + idx).astype(str), 10).astype(object) + 'A',
+            'company_name': pattern_names + ' ' + number + ' Pte Ltd',
+            'company_type': np.array(company_types, dtype=object)[idx % len(company_types)],
+            'primary_ssic_code': np.array([code for code, _ in industries], dtype=object)[industry_idx],
+            'primary_ssic_description': np.array([desc for _, desc in industries], dtype=object)[industry_idx],
+            'reg_street_name': 'Street ' + number,
+            'reg_postal_code': np.char.zfill((100000 + idx % 900000).astype(str), 6).astype(object),
+            'incorporation_date': (
+                '20' + (10 + idx % 15).astype(str).astype(object) + '-'
+                + np.char.zfill((1 + idx % 12).astype(str), 2).astype(object) + '-'
+                + np.char.zfill((1 + idx % 28).astype(str), 2).astype(object)
+            ),
+            'company_status': np.where(idx % 20 != 0, 'Live Company', 'Struck Off').astype(object),
+            'source': 'sample_data',
+            'extraction_timestamp': datetime.now().isoformat()
+        })
+        
+        return df.to_dict('records')
     
-    def _generate_company_name(self, index: int, industry_desc: str) -> str:
-        """Generate realistic company names based on industry"""
+    def _get_name_patterns(self, industry_desc: str) -> List[str]:
+        """Get company name patterns for an industry description"""
         name_patterns = {
             'Computer programming': ['Tech Solutions', 'Digital Systems', 'Software Innovations', 'Cyber Solutions'],
             'Restaurants': ['Food Paradise', 'Culinary Delights', 'Taste Buds', 'Flavour House'],
@@ -187,41 +309,152 @@ class SGDataExtractor:
         
         # Find matching pattern
         pattern_key = next((key for key in name_patterns.keys() if key.lower() in industry_desc.lower()), 'Holdings')
-        patterns = name_patterns.get(pattern_key, ['Solutions', 'Services', 'Holdings'])
-        
-        pattern = patterns[index % len(patterns)]
-        number = index + 1
-        
-        return f'{pattern} {number} Pte Ltd'
+        return name_patterns.get(pattern_key, ['Solutions', 'Services', 'Holdings'])
+    
+    def _candidate_domains(self, company_name: str) -> List[str]:
+        """Build candidate website URLs from the common Singapore domain patterns"""
+        clean_name = _NAME_QUALIFIER_RE.sub(' ', company_name.lower()).strip()
+        clean_name = _NON_LABEL_RE.sub('', _LEGAL_SUFFIX_RE.sub('', clean_name))
+        if not clean_name or len(clean_name) > _MAX_LABEL_LENGTH:
+            # Nothing usable as a hostname, so there is nothing to probe
+            return []
+        return [pattern.format(name=clean_name) for pattern in self.domain_patterns]
     
     def search_company_websites(self, company_name: str) -> Optional[str]:
         """
-        Search for company website using search engines
+        Search for company website by probing candidate domains
         
         Note: In production, you would use search APIs like:
         - Google Custom Search API
         - Bing Search API
         - DuckDuckGo API
         """
+        return self.search_company_websites_batch([company_name])[0]
+    
+    async def _probe_company_website(self, company_name: str, session,
+                                     semaphore: asyncio.Semaphore) -> Tuple[Optional[str], bool]:
+        """
+        First candidate domain, in pattern order, that answers a HEAD request with 2xx,
+        and whether that answer is settled (False when a candidate could not be reached)
+        """
+        unreachable = False
+        
+        async def probe(url: str) -> Optional[str]:
+            nonlocal unreachable
+            async with semaphore:
+                try:
+                    async with session.head(url, allow_redirects=True, timeout=aiohttp.ClientTimeout(total=3)) as response:
+                        return url if 200 <= response.status < 300 else None
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    unreachable = True
+                    return None
+        
         try:
-            # Simulate website search - in reality use actual search APIs
-            clean_name = company_name.lower().replace(' pte ltd', '').replace(' ', '')
-            
-            # Common Singapore domain patterns
-            possible_domains = [
-                f"https://www.{clean_name}.com.sg",
-                f"https://www.{clean_name}.sg", 
-                f"https://{clean_name}.com",
-                f"https://www.{clean_name}.com"
-            ]
-            
-            # In production, you would actually check if these domains exist
-            # For now, return the first pattern for demo
-            return possible_domains[0]
+            # Probe all candidates at once, but answer with the most likely pattern that
+            # responded 2xx; lower-priority probes are cancelled once that is decided
+            tasks = [asyncio.ensure_future(probe(url)) for url in self._candidate_domains(company_name)]
+            try:
+                for task in tasks:
+                    website = await task
+                    if website:
+                        return website, True
+            finally:
+                for task in tasks:
+                    task.cancel()
+            # Only a non-2xx answer from every candidate shows there is no website
+            return None, not unreachable
             
         except Exception as e:
             logger.error(f"Error searching website for {company_name}: {e}")
-            return None
+            return None, False
+    
+    def search_company_websites_batch(self, company_names: List[str]) -> List[Optional[str]]:
+        """Search websites for a batch of companies on one event loop"""
+        if not AIOHTTP_AVAILABLE:
+            # Without aiohttp we cannot probe, so fall back to the most likely pattern
+            return [next(iter(self._candidate_domains(name)), None) for name in company_names]
+        
+        # Names repeat within a run and across runs, so only unseen ones are probed
+        name_keys = [name.lower().strip() for name in company_names]
+        unique_keys = list(dict.fromkeys(name_keys))
+        # Answers are assembled locally; the bounded memory cache may evict while it is filled
+        websites = {key: self._website_cache[key] for key in unique_keys if key in self._website_cache}
+        websites.update(self._load_cached_websites([key for key in unique_keys if key not in websites]))
+        to_probe = [key for key in unique_keys if key not in websites]
+        
+        self.website_cache_stats['misses'] += len(to_probe)
+        self.website_cache_stats['hits'] += len(name_keys) - len(to_probe)
+        
+        if to_probe:
+            async def search_all() -> List[Tuple[Optional[str], bool]]:
+                semaphore = asyncio.Semaphore(config.scraping.max_concurrent_requests)
+                async with aiohttp.ClientSession(headers=self.session.headers) as session:
+                    return await asyncio.gather(*[
+                        self._probe_company_website(key, session, semaphore)
+                        for key in to_probe
+                    ])
+            
+            settled = {}
+            for key, (website, is_settled) in zip(to_probe, asyncio.run(search_all())):
+                websites[key] = website
+                if is_settled:
+                    settled[key] = website
+            # Unreachable candidates are retried on a later search instead of being cached as misses
+            self._store_cached_websites(settled)
+        
+        return [websites[key] for key in name_keys]
+    
+    def _open_website_cache(self) -> sqlite3.Connection:
+        """Persistent website search cache, opened on first use"""
+        if self._website_cache_conn is None:
+            cache_dir = Path(config.scraping.cache_dir)
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            self._website_cache_conn = sqlite3.connect(
+                cache_dir / "websites.db", isolation_level=None, check_same_thread=False
+            )
+            self._website_cache_conn.execute(
+                "CREATE TABLE IF NOT EXISTS website_cache (name_key TEXT PRIMARY KEY, website TEXT)"
+            )
+        return self._website_cache_conn
+    
+    def _load_cached_websites(self, name_keys: List[str]) -> Dict[str, Optional[str]]:
+        """Pull previously searched names from the persistent cache into memory and return them"""
+        loaded: Dict[str, Optional[str]] = {}
+        if not name_keys or not config.scraping.use_cache:
+            return loaded
+        try:
+            conn = self._open_website_cache()
+            for i in range(0, len(name_keys), 500):  # Stay under SQLite's bound-parameter limit
+                chunk = name_keys[i:i + 500]
+                rows = conn.execute(
+                    f"SELECT name_key, website FROM website_cache WHERE name_key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                )
+                loaded.update(rows)
+        except sqlite3.Error as e:
+            logger.warning(f"Website cache unavailable: {e}")
+        self._remember_websites(loaded)
+        return loaded
+    
+    def _store_cached_websites(self, websites: Dict[str, Optional[str]]):
+        """Record fresh search results in memory and in the persistent cache"""
+        # Also written with use_cache off, so a --no-cache run refreshes stale entries
+        self._remember_websites(websites)
+        if not websites:
+            return
+        try:
+            self._open_website_cache().executemany(
+                "INSERT OR REPLACE INTO website_cache (name_key, website) VALUES (?, ?)",
+                websites.items()
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not persist website cache: {e}")
+    
+    def _remember_websites(self, websites: Dict[str, Optional[str]]):
+        self._website_cache.update(websites)
+        # Dicts keep insertion order, so the oldest entries go first
+        while len(self._website_cache) > _WEBSITE_CACHE_MAX_ENTRIES:
+            del self._website_cache[next(iter(self._website_cache))]
     
     def get_extraction_stats(self) -> Dict:
         """Get statistics about the extraction process"""
@@ -230,6 +463,7 @@ class SGDataExtractor:
             'total_sources_accessed': 2,
             'successful_extractions': 1500,
             'failed_extractions': 0,
+            'website_cache': dict(self.website_cache_stats),
             'data_coverage': {
                 'uen': 100.0,
                 'company_name': 100.0,
@@ -2,116 +2,148 @@
 # Entity matching and deduplication for company records
 
 import logging
+import multiprocessing
+import os
 from typing import List, Dict, Tuple, Optional
 from urllib.parse import urlparse
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from operator import itemgetter
+import heapq
 import re
+import zlib
+from functools import lru_cache
+import numpy as np
 
 # Fuzzy matching
 try:
-    from fuzzywuzzy import fuzz, process
-    FUZZYWUZZY_AVAILABLE = True
+    from rapidfuzz import fuzz, process
+    RAPIDFUZZ_AVAILABLE = True
+    
+    # (scorer, weight, best-case contribution of the scorers after it), cheapest first
+    _WEIGHTED_SCORERS = (
+        (fuzz.ratio, 0.2, 80.0),
+        (fuzz.partial_ratio, 0.2, 60.0),
+        (fuzz.token_sort_ratio, 0.3, 30.0),
+        (fuzz.token_set_ratio, 0.3, 0.0),
+    )
 except ImportError:
-    FUZZYWUZZY_AVAILABLE = False
-    logging.warning("FuzzyWuzzy not available. Entity matching will be limited.")
+    RAPIDFUZZ_AVAILABLE = False
+    logging.warning("RapidFuzz not available. Entity matching will be limited.")
 
 logger = logging.getLogger(__name__)
 
-class EntityMatcher:
-    """Handles entity matching and deduplication"""
+# Slack for float rounding when deciding a partial blend can no longer reach the threshold
+_SCORE_EPSILON = 1e-6
+
+# Compiled once for the normalization and text-combining helpers
+_PUNCT_RE = re.compile(r'[^\w\s]')
+_WS_RE = re.compile(r'\s+')
+_DELIMITER_RE = re.compile(r'[,;|]')
+
+# Common company suffixes, stripped in this order by _normalize_company_name
+_COMPANY_SUFFIXES = (
+    'pte ltd', 'pte. ltd.', 'private limited',
+    'ltd', 'ltd.', 'limited',
+    'inc', 'inc.', 'incorporated',
+    'corp', 'corp.', 'corporation',
+    'llc', 'l.l.c.',
+    'sdn bhd', 'sdn. bhd.',
+    'co', 'co.', 'company'
+)
+
+# Suffix stripping as one pattern matched against the reversed name: each
+# optional group mirrors one pass of the ordered suffix check, and matching
+# from the start avoids trying every position for a trailing anchor
+_REVERSED_SUFFIX_RE = re.compile(
+    ''.join(f"(?:\\s*{re.escape(suffix[::-1])} )?" for suffix in _COMPANY_SUFFIXES)
+)
+
+def _first_above(scores: np.ndarray, threshold: float) -> Optional[int]:
+    """Index of the first score at or above threshold, found in C without building an index array"""
+    above = scores >= threshold
+    first = int(above.argmax())
+    return first if above[first] else None
+
+# Below this many companies, process start-up outweighs parallel deduplication
+_MIN_PARALLEL_COMPANIES = 5000
+
+# Mersenne prime for MinHash; small enough that a * hash + b stays within uint64
+_MINHASH_PRIME = (1 << 31) - 1
+
+class _BigramMinHashLSH:
+    """MinHash LSH over character bigrams, used to block fuzzy name candidates"""
     
-    def __init__(self, threshold: int = 85):
-        self.threshold = threshold
-        self.fuzzy_available = FUZZYWUZZY_AVAILABLE
+    def __init__(self, num_perm: int = 32, bands: int = 16, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MINHASH_PRIME, num_perm, dtype=np.uint64)[:, None]
+        self._b = rng.integers(0, _MINHASH_PRIME, num_perm, dtype=np.uint64)[:, None]
+        self._rows = num_perm // bands
+        self._buckets = [{} for _ in range(bands)]
     
-    def fuzzy_match_companies(self, companies: List[Dict]) -> List[Dict]:
-        """Match and merge duplicate companies"""
-        if not companies:
-            return []
-        
-        logger.info(f"Starting entity matching for {len(companies)} companies")
-        
-        matched_companies = []
-        processed_companies = []
-        
-        for company in companies:
-            # Skip companies without basic information
-            if not company.get('company_name'):
-                continue
-            
-            # Find potential matches
-            best_match_idx = self._find_best_match(company, processed_companies)
-            
-            if best_match_idx is not None:
-                # Merge with existing company
-                merged_company = self._merge_companies(
-                    processed_companies[best_match_idx], 
-                    company
-                )
-                processed_companies[best_match_idx] = merged_company
-                matched_companies[best_match_idx] = merged_company
-            else:
-                # Add as new company
-                processed_companies.append(company.copy())
-                matched_companies.append(company.copy())
-        
-        logger.info(f"Entity matching completed. Reduced from {len(companies)} to {len(matched_companies)} companies")
-        return matched_companies
+    def _band_keys(self, name: str) -> List[bytes]:
+        """Per-band keys of the name's MinHash signature"""
+        padded = f' {name} '
+        shingles = {padded[i:i + 2] for i in range(len(padded) - 1)}
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode()) % _MINHASH_PRIME for shingle in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+        signature = ((self._a * hashes + self._b) % _MINHASH_PRIME).min(axis=1)
+        return [signature[i:i + self._rows].tobytes() for i in range(0, len(signature), self._rows)]
     
-    def _find_best_match(self, company: Dict, existing_companies: List[Dict]) -> Optional[int]:
-        """Find the best matching company in existing list"""
-        if not existing_companies:
-            return None
-        
-        company_name = company.get('company_name', '').strip()
-        company_uen = company.get('uen', '').strip()
-        company_website = company.get('website', '').strip()
-        
-        for idx, existing in enumerate(existing_companies):
-            existing_name = existing.get('company_name', '').strip()
-            existing_uen = existing.get('uen', '').strip()
-            existing_website = existing.get('website', '').strip()
-            
-            # Perfect UEN match (highest priority)
-            if company_uen and existing_uen and company_uen == existing_uen:
-                return idx
+    def band_keys_batch(self, names: List[str], chunk_size: int = 2048) -> List[List[bytes]]:
+        """_band_keys for many names, hashing each chunk of names in one NumPy pass"""
+        band_width = self._rows * np.dtype(np.uint64).itemsize
+        all_keys = []
+        for start in range(0, len(names), chunk_size):
+            shingle_sets = []
+            for name in names[start:start + chunk_size]:
+                padded = f' {name} '
+                shingle_sets.append({padded[i:i + 2] for i in range(len(padded) - 1)})
             
-            # Perfect website match (high priority)
-            if (company_website and existing_website and 
-                self._normalize_website(company_website) == self._normalize_website(existing_website)):
-                return idx
+            # Flat column of every shingle hash, with each name's run starting at its offset
+            counts = np.fromiter(map(len, shingle_sets), dtype=np.int64, count=len(shingle_sets))
+            hashes = np.fromiter(
+                (zlib.crc32(shingle.encode()) % _MINHASH_PRIME for shingle in chain.from_iterable(shingle_sets)),
+                dtype=np.uint64, count=int(counts.sum())
+            )
+            offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            signatures = np.minimum.reduceat((self._a * hashes + self._b) % _MINHASH_PRIME, offsets, axis=1)
             
-            # Fuzzy name matching
-            if company_name and existing_name:
-                similarity = self._calculate_name_similarity(company_name, existing_name)
-                if similarity >= self.threshold:
-                    return idx
-        
-        return None
+            for row in np.ascontiguousarray(signatures.T):
+                signature = row.tobytes()
+                all_keys.append([signature[i:i + band_width] for i in range(0, len(signature), band_width)])
+        return all_keys
     
-# entity_matcher.py
-# Entity matching and deduplication for company records
-
-import logging
-from typing import List, Dict, Tuple, Optional
-from urllib.parse import urlparse
-import re
-
-# Fuzzy matching
-try:
-    from fuzzywuzzy import fuzz, process
-    FUZZYWUZZY_AVAILABLE = True
-except ImportError:
-    FUZZYWUZZY_AVAILABLE = False
-    logging.warning("FuzzyWuzzy not available. Entity matching will be limited.")
+    def insert(self, idx: int, name: str, band_keys: Optional[List[bytes]] = None):
+        for bucket, key in zip(self._buckets, band_keys or self._band_keys(name)):
+            bucket.setdefault(key, []).append(idx)
+    
+    def query(self, name: str, band_keys: Optional[List[bytes]] = None) -> List[int]:
+        """Indices sharing at least one band with name, in insertion order"""
+        candidates = set()
+        for bucket, key in zip(self._buckets, band_keys or self._band_keys(name)):
+            candidates.update(bucket.get(key, ()))
+        return sorted(candidates)
 
-logger = logging.getLogger(__name__)
+def _match_shard_worker(threshold: int, shard: List[Tuple[int, Dict]]) -> List[Tuple[int, Dict]]:
+    """Process-pool entry point: deduplicate one shard with a fresh matcher"""
+    return EntityMatcher(threshold)._match_shard(shard)
 
 class EntityMatcher:
     """Handles entity matching and deduplication"""
     
-    def __init__(self, threshold: int = 85):
+    def __init__(self, threshold: int = 85, use_lsh_blocking: bool = True, max_workers: int = 1):
         self.threshold = threshold
-        self.fuzzy_available = FUZZYWUZZY_AVAILABLE
+        self.fuzzy_available = RAPIDFUZZ_AVAILABLE
+        self.use_lsh_blocking = use_lsh_blocking
+        self.max_workers = max_workers
+        
+        # Exact-key blocking indexes into the processed companies list
+        self._uen_index: Dict[str, int] = {}
+        self._domain_index: Dict[str, int] = {}
+        self._name_lsh: Optional[_BigramMinHashLSH] = None
     
     def fuzzy_match_companies(self, companies: List[Dict]) -> List[Dict]:
         """Match and merge duplicate companies"""
@@ -120,16 +152,97 @@ class EntityMatcher:
         
         logger.info(f"Starting entity matching for {len(companies)} companies")
         
-        matched_companies = []
+        # With LSH blocking, companies sharing no UEN, domain or name band can never
+        # match, so independent groups of them are deduplicated in parallel processes
+        # (the matching loop is Python-bound, so threads would serialize on the GIL)
+        workers = min(self.max_workers, os.cpu_count() or 1)
+        shards = []
+        if self.use_lsh_blocking and workers > 1 and len(companies) >= _MIN_PARALLEL_COMPANIES:
+            shards = self._partition_by_blocking_keys(companies, workers)
+        if len(shards) > 1:
+            # spawn rather than fork: the pipeline already runs logging and transform threads
+            with ProcessPoolExecutor(max_workers=len(shards), mp_context=multiprocessing.get_context('spawn')) as executor:
+                shard_results = list(executor.map(_match_shard_worker, [self.threshold] * len(shards), shards))
+            # Each record sorted by the input position that created it, as in a sequential run
+            matched_companies = [company for _, company in sorted(chain.from_iterable(shard_results), key=itemgetter(0))]
+        else:
+            matched_companies = [company for _, company in self._match_shard(list(enumerate(companies)))]
+        
+        logger.info(f"Entity matching completed. Reduced from {len(companies)} to {len(matched_companies)} companies")
+        return matched_companies
+    
+    def _partition_by_blocking_keys(self, companies: List[Dict], workers: int) -> List[List[Tuple[int, Dict]]]:
+        """Group companies connected through shared blocking keys into at most workers shards"""
+        band_lsh = _BigramMinHashLSH()
+        parent = list(range(len(companies)))
+        
+        def find(pos: int) -> int:
+            while parent[pos] != pos:
+                parent[pos] = parent[parent[pos]]
+                pos = parent[pos]
+            return pos
+        
+        key_owners = {}
+        named_positions = [pos for pos, company in enumerate(companies) if company.get('company_name')]
+        name_band_keys = band_lsh.band_keys_batch([
+            self._normalize_company_name(companies[pos]['company_name'].strip()) for pos in named_positions
+        ])
+        for pos, band_keys in zip(named_positions, name_band_keys):
+            keys = list(enumerate(band_keys))
+            uen, domain = self._matching_keys(companies[pos])
+            if uen:
+                keys.append(('uen', uen))
+            if domain is not None:
+                keys.append(('domain', domain))
+            
+            for key in keys:
+                owner = key_owners.setdefault(key, pos)
+                if owner != pos:
+                    parent[find(pos)] = find(owner)
+        
+        components = {}
+        for pos in named_positions:
+            components.setdefault(find(pos), []).append(pos)
+        
+        # Largest groups first onto the least loaded shard
+        shards = [[] for _ in range(min(workers, len(components)))]
+        loads = [(0, i) for i in range(len(shards))]
+        for positions in sorted(components.values(), key=len, reverse=True):
+            load, i = heapq.heappop(loads)
+            shards[i].extend(positions)
+            heapq.heappush(loads, (load + len(positions), i))
+        
+        return [[(pos, companies[pos]) for pos in sorted(shard)] for shard in shards]
+    
+    def _match_shard(self, indexed_companies: List[Tuple[int, Dict]]) -> List[Tuple[int, Dict]]:
+        """Sequentially match and merge companies, returning (input position, record) pairs"""
+        # Matching keys live in parallel lists indexed like processed_companies, so the
+        # hot loop never goes back to the record dicts
         processed_companies = []
+        processed_names = []  # Normalized names
+        processed_uens = []
+        processed_domains = []  # Normalized website domains, None without a website
+        first_positions = []  # Input position of the company that created each record
+        self._uen_index = {}
+        self._domain_index = {}
+        self._name_lsh = _BigramMinHashLSH() if self.use_lsh_blocking else None
+        
+        # Skip companies without basic information, then build the name columns up front
+        # so the LSH signatures of all input names are computed in batched NumPy passes
+        named_companies = [(pos, company) for pos, company in indexed_companies if company.get('company_name')]
+        company_names = [company['company_name'].strip() for _, company in named_companies]
+        norm_names = [self._normalize_company_name(company_name) for company_name in company_names]
+        if self._name_lsh:
+            name_band_keys = self._name_lsh.band_keys_batch(norm_names)
+        else:
+            name_band_keys = [None] * len(norm_names)
         
-        for company in companies:
-            # Skip companies without basic information
-            if not company.get('company_name'):
-                continue
+        for (pos, company), company_name, norm_name, band_keys in zip(
+                named_companies, company_names, norm_names, name_band_keys):
+            uen, domain = self._matching_keys(company)
             
             # Find potential matches
-            best_match_idx = self._find_best_match(company, processed_companies)
+            best_match_idx = self._find_best_match(company_name, norm_name, uen, domain, processed_names, band_keys)
             
             if best_match_idx is not None:
                 # Merge with existing company
@@ -137,47 +250,105 @@ class EntityMatcher:
                     processed_companies[best_match_idx], 
                     company
                 )
+                self._unindex_company(best_match_idx, processed_uens[best_match_idx], processed_domains[best_match_idx])
+                merged_uen, merged_domain = self._matching_keys(merged_company)
+                self._index_company(best_match_idx, merged_uen, merged_domain)
                 processed_companies[best_match_idx] = merged_company
-                matched_companies[best_match_idx] = merged_company
+                processed_uens[best_match_idx] = merged_uen
+                processed_domains[best_match_idx] = merged_domain
+                processed_names[best_match_idx] = self._normalize_company_name(
+                    merged_company.get('company_name', '').strip()
+                )
+                if self._name_lsh and processed_names[best_match_idx] != norm_name:
+                    self._name_lsh.insert(best_match_idx, processed_names[best_match_idx])
             else:
                 # Add as new company
+                self._index_company(len(processed_companies), uen, domain)
                 processed_companies.append(company.copy())
-                matched_companies.append(company.copy())
-        
-        logger.info(f"Entity matching completed. Reduced from {len(companies)} to {len(matched_companies)} companies")
-        return matched_companies
+                first_positions.append(pos)
+                processed_names.append(norm_name)
+                processed_uens.append(uen)
+                processed_domains.append(domain)
+                if self._name_lsh:
+                    self._name_lsh.insert(len(processed_names) - 1, norm_name, band_keys)
+        
+        return list(zip(first_positions, processed_companies))
     
-    def _find_best_match(self, company: Dict, existing_companies: List[Dict]) -> Optional[int]:
-        """Find the best matching company in existing list"""
-        if not existing_companies:
+    def _find_best_match(self, company_name: str, norm_name: str, uen: str, domain: Optional[str],
+                         existing_names: List[str], band_keys: Optional[List[bytes]] = None) -> Optional[int]:
+        """Find the best matching company among the processed ones"""
+        if not existing_names:
             return None
         
-        company_name = company.get('company_name', '').strip()
-        company_uen = company.get('uen', '').strip()
-        company_website = company.get('website', '').strip()
-        
-        for idx, existing in enumerate(existing_companies):
-            existing_name = existing.get('company_name', '').strip()
-            existing_uen = existing.get('uen', '').strip()
-            existing_website = existing.get('website', '').strip()
-            
-            # Perfect UEN match (highest priority)
-            if company_uen and existing_uen and company_uen == existing_uen:
-                return idx
-            
-            # Perfect website match (high priority)
-            if (company_website and existing_website and 
-                self._normalize_website(company_website) == self._normalize_website(existing_website)):
-                return idx
+        # Perfect UEN match (highest priority)
+        if uen and uen in self._uen_index:
+            return self._uen_index[uen]
+        
+        # Perfect website match (high priority)
+        if domain is not None:
+            domain_idx = self._domain_index.get(domain)
+            if domain_idx is not None:
+                return domain_idx
+        
+        # Fuzzy name matching in one vectorized pass, restricted to LSH bucket-mates when blocking
+        if company_name:
+            if self._name_lsh:
+                candidate_idx = self._name_lsh.query(norm_name, band_keys)
+                candidate_names = [existing_names[i] for i in candidate_idx]
+            else:
+                candidate_idx = range(len(existing_names))
+                candidate_names = existing_names
             
-            # Fuzzy name matching
-            if company_name and existing_name:
-                similarity = self._calculate_name_similarity(company_name, existing_name)
-                if similarity >= self.threshold:
-                    return idx
+            if candidate_names:
+                scores = self._name_similarity_scores(norm_name, candidate_names)
+                hit = _first_above(scores, self.threshold)
+                if hit is not None:
+                    return candidate_idx[hit]
         
         return None
     
+    def _matching_keys(self, company: Dict) -> Tuple[str, Optional[str]]:
+        """A company's stripped UEN and normalized website domain (None without a website)"""
+        uen = (company.get('uen') or '').strip()
+        website = (company.get('website') or '').strip()
+        return uen, self._normalize_website(website) if website else None
+    
+    def _index_company(self, idx: int, uen: str, domain: Optional[str]):
+        """Register a processed company's UEN and domain in the blocking indexes"""
+        if uen:
+            self._uen_index.setdefault(uen, idx)
+        if domain is not None:
+            self._domain_index.setdefault(domain, idx)
+    
+    def _unindex_company(self, idx: int, uen: str, domain: Optional[str]):
+        """Drop a processed company's keys before they are replaced by a merge"""
+        if uen and self._uen_index.get(uen) == idx:
+            del self._uen_index[uen]
+        if domain is not None and self._domain_index.get(domain) == idx:
+            del self._domain_index[domain]
+    
+    def _name_similarity_scores(self, norm_name: str, candidate_names: List[str]) -> np.ndarray:
+        """Similarity of one normalized name against many normalized candidates"""
+        if self.fuzzy_available:
+            # Same weighted blend as _normalized_similarity, each scorer run in C over the
+            # candidates whose best-case blend can still reach the threshold
+            scores = np.zeros(len(candidate_names), dtype=np.float64)
+            alive = np.arange(len(candidate_names))
+            for scorer, weight, remaining_best in _WEIGHTED_SCORERS:
+                names = [candidate_names[i] for i in alive]
+                # Score every candidate needs at least to stay alive; below it RapidFuzz
+                # can bail out early and return 0, and such candidates are pruned anyway
+                score_cutoff = (self.threshold - scores[alive].max() - remaining_best) / weight - _SCORE_EPSILON
+                scores[alive] += process.cdist(
+                    [norm_name], names, scorer=scorer, dtype=np.float64, score_cutoff=max(score_cutoff, 0.0)
+                )[0] * weight
+                alive = alive[scores[alive] + remaining_best >= self.threshold - _SCORE_EPSILON]
+                if not alive.size:
+                    break
+            return scores
+        
+        return np.array([self._normalized_similarity(norm_name, candidate) for candidate in candidate_names])
+    
     def _calculate_name_similarity(self, name1: str, name2: str) -> float:
         """Calculate similarity between two company names"""
         if not name1 or not name2:
@@ -187,18 +358,14 @@ class EntityMatcher:
         norm_name1 = self._normalize_company_name(name1)
         norm_name2 = self._normalize_company_name(name2)
         
+        return self._normalized_similarity(norm_name1, norm_name2)
+    
+    def _normalized_similarity(self, norm_name1: str, norm_name2: str) -> float:
+        """Calculate similarity between two already-normalized company names"""
         if self.fuzzy_available:
-            # Use multiple fuzzy matching methods
-            ratio = fuzz.ratio(norm_name1, norm_name2)
-            partial_ratio = fuzz.partial_ratio(norm_name1, norm_name2)
-            token_sort_ratio = fuzz.token_sort_ratio(norm_name1, norm_name2)
-            token_set_ratio = fuzz.token_set_ratio(norm_name1, norm_name2)
-            
-            # Weighted average favoring token-based methods for company names
-            similarity = (ratio * 0.2 + partial_ratio * 0.2 + 
-                         token_sort_ratio * 0.3 + token_set_ratio * 0.3)
-            
-            return similarity
+            # Weighted average favoring token-based methods for company names; the full
+            # blend is returned, threshold pruning only happens in _name_similarity_scores
+            return sum(scorer(norm_name1, norm_name2) * weight for scorer, weight, _ in _WEIGHTED_SCORERS)
         else:
             # Simple string comparison fallback
             if norm_name1 == norm_name2:
@@ -208,7 +375,9 @@ class EntityMatcher:
             else:
                 return 0.0
     
-    def _normalize_company_name(self, name: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def _normalize_company_name(name: str) -> str:
         """Normalize company name for comparison"""
         if not name:
             return ""
@@ -217,27 +386,19 @@ class EntityMatcher:
         normalized = name.lower().strip()
         
         # Remove common company suffixes
-        suffixes = [
-            'pte ltd', 'pte. ltd.', 'private limited',
-            'ltd', 'ltd.', 'limited',
-            'inc', 'inc.', 'incorporated',
-            'corp', 'corp.', 'corporation',
-            'llc', 'l.l.c.',
-            'sdn bhd', 'sdn. bhd.',
-            'co', 'co.', 'company'
-        ]
-        
-        for suffix in suffixes:
-            if normalized.endswith(' ' + suffix):
-                normalized = normalized[:-len(suffix)-1].strip()
+        suffix_length = _REVERSED_SUFFIX_RE.match(normalized[::-1]).end()
+        if suffix_length:
+            normalized = normalized[:-suffix_length].rstrip()
         
         # Remove extra whitespace and special characters
-        normalized = re.sub(r'[^\w\s]', ' ', normalized)
-        normalized = re.sub(r'\s+', ' ', normalized).strip()
+        normalized = _PUNCT_RE.sub(' ', normalized)
+        normalized = _WS_RE.sub(' ', normalized).strip()
         
         return normalized
     
-    def _normalize_website(self, website: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def _normalize_website(website: str) -> str:
         """Normalize website URL for comparison"""
         if not website:
             return ""
@@ -317,40 +478,23 @@ class EntityMatcher:
         if not text2:
             return text1
         
-        # Split by common delimiters
-        items1 = re.split(r'[,;|]', text1)
-        items2 = re.split(r'[,;|]', text2)
-        
-        # Clean and deduplicate
-        all_items = []
-        seen = set()
-        
-        for item in items1 + items2:
+        # Split by common delimiters; dedupe case-insensitively, keeping first spelling
+        unique_items = {}
+        for item in _DELIMITER_RE.split(f"{text1},{text2}"):
             clean_item = item.strip()
-            if clean_item and clean_item.lower() not in seen:
-                all_items.append(clean_item)
-                seen.add(clean_item.lower())
+            if clean_item:
+                unique_items.setdefault(clean_item.lower(), clean_item)
         
-        return ', '.join(all_items)
+        return ', '.join(unique_items.values())
     
     def _combine_sources(self, source1: str, source2: str) -> str:
         """Combine source information"""
-        sources = []
-        
-        if source1:
-            sources.extend(source1.split(','))
-        if source2:
-            sources.extend(source2.split(','))
-        
         # Remove duplicates while preserving order
-        unique_sources = []
-        seen = set()
-        
-        for source in sources:
+        unique_sources = {}
+        for source in f"{source1 or ''},{source2 or ''}".split(','):
             clean_source = source.strip()
-            if clean_source and clean_source not in seen:
-                unique_sources.append(clean_source)
-                seen.add(clean_source)
+            if clean_source:
+                unique_sources[clean_source] = None
         
         return ', '.join(unique_sources)
     
@@ -1,20 +1,31 @@
 # llm_processor.py
 # LLM integration for data enrichment and classification
 
+import hashlib
 import logging
 import re
+from functools import lru_cache
 from typing import Optional, List, Dict
-from collections import Counter
+
+from config import config
 
 # LLM imports
 try:
-    from transformers import pipeline, AutoTokenizer, AutoModelForCausalLM
+    from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
     import torch
     TRANSFORMERS_AVAILABLE = True
 except ImportError:
     TRANSFORMERS_AVAILABLE = False
     logging.warning("Transformers not available. LLM features will be limited.")
 
+# bitsandbytes for int8/int4 weight quantization on GPU
+try:
+    import bitsandbytes
+    from transformers import BitsAndBytesConfig
+    BITSANDBYTES_AVAILABLE = True
+except (ImportError, RuntimeError):  # Some builds raise RuntimeError on import without a usable GPU
+    BITSANDBYTES_AVAILABLE = False
+
 # NLTK for text processing
 try:
     import nltk
@@ -24,16 +35,107 @@ except ImportError:
     NLTK_AVAILABLE = False
     logging.warning("NLTK not available. Text processing will be limited.")
 
+# Aho-Corasick for single-pass keyword matching
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+    logging.warning("pyahocorasick not available. Using substring scans for rule-based classification.")
+
 logger = logging.getLogger(__name__)
 
+# Words considered for keyword extraction (3+ characters, alphabetic)
+_WORD_RE = re.compile(r'\b[a-zA-Z]{3,}\b')
+
+# Basic stop words for keyword extraction without NLTK
+_SIMPLE_STOP_WORDS = frozenset({
+    'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
+    'by', 'from', 'up', 'about', 'into', 'through', 'during', 'before',
+    'after', 'above', 'below', 'between', 'among', 'company', 'ltd', 'pte',
+    'singapore', 'services', 'solutions', 'group', 'holdings', 'international',
+    'private', 'limited', 'our', 'we', 'us', 'you', 'your', 'they', 'their'
+})
+
+# Revenue amounts and description cues for company size
+_NUMBER_RE = re.compile(r'\d+(?:\.\d+)?')
+_LARGE_COMPANY_INDICATORS = ('multinational', 'global', 'international', 'enterprise', 'corporation')
+_SMALL_COMPANY_INDICATORS = ('startup', 'boutique', 'local', 'family', 'small')
+
+# Domain-specific stop words added to NLTK's English list
+_DOMAIN_STOP_WORDS = frozenset({
+    'company', 'ltd', 'pte', 'singapore', 'services', 'solutions',
+    'group', 'holdings', 'international', 'private', 'limited'
+})
+
+@lru_cache(maxsize=None)
+def _nltk_stop_words() -> Optional[frozenset]:
+    """NLTK English stop words plus domain terms, downloaded and loaded once; None if unavailable"""
+    try:
+        try:
+            nltk.data.find('corpora/stopwords')
+        except LookupError:
+            nltk.download('stopwords', quiet=True)
+        return frozenset(stopwords.words('english')) | _DOMAIN_STOP_WORDS
+    except Exception as e:
+        logger.error(f"NLTK stop words unavailable, using simple keyword extraction: {e}")
+        return None
+
+# Keyword patterns for rule-based industry classification
+_INDUSTRY_KEYWORDS = {
+    'Technology': ['software', 'tech', 'digital', 'computer', 'programming', 'app', 'web', 'it', 'cyber', 'data', 'ai', 'artificial intelligence'],
+    'Finance': ['bank', 'finance', 'investment', 'insurance', 'fund', 'capital', 'trading', 'financial', 'loan', 'credit'],
+    'Healthcare': ['health', 'medical', 'hospital', 'clinic', 'healthcare', 'pharmaceutical', 'drug', 'medicine', 'therapy'],
+    'Manufacturing': ['manufacturing', 'factory', 'production', 'industrial', 'machinery', 'equipment', 'assembly'],
+    'Retail': ['retail', 'shop', 'store', 'sales', 'commerce', 'trading', 'merchandise', 'goods'],
+    'Education': ['education', 'school', 'university', 'training', 'learning', 'academic', 'teaching', 'course'],
+    'Real Estate': ['real estate', 'property', 'housing', 'construction', 'building', 'development', 'land'],
+    'Transportation': ['transport', 'logistics', 'shipping', 'delivery', 'freight', 'cargo', 'aviation', 'maritime'],
+    'Food & Beverage': ['food', 'restaurant', 'catering', 'beverage', 'dining', 'culinary', 'cafe', 'bar'],
+    'Professional Services': ['consulting', 'advisory', 'legal', 'accounting', 'audit', 'professional', 'services'],
+    'Construction': ['construction', 'contractor', 'building', 'civil', 'engineering', 'infrastructure'],
+    'Media & Entertainment': ['media', 'entertainment', 'advertising', 'marketing', 'creative', 'design', 'agency'],
+    'Energy': ['energy', 'oil', 'gas', 'renewable', 'solar', 'power', 'utility', 'electricity'],
+    'Telecommunications': ['telecom', 'telecommunications', 'mobile', 'network', 'communication', 'broadband']
+}
+
+# Upper bound on memoized classifications/keyword sets per processor
+_CACHE_MAX_ENTRIES = 4096
+
+# Reverse lookup: a keyword may count towards several industries
+_KEYWORD_INDUSTRIES: Dict[str, List[str]] = {}
+for _industry, _keywords in _INDUSTRY_KEYWORDS.items():
+    for _keyword in _keywords:
+        _KEYWORD_INDUSTRIES.setdefault(_keyword, []).append(_industry)
+
+def _build_keyword_automaton():
+    """Build an Aho-Corasick automaton over all industry keywords"""
+    automaton = ahocorasick.Automaton()
+    for keyword in _KEYWORD_INDUSTRIES:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+def _description_key(text: str) -> bytes:
+    """Hash of a description with case and whitespace normalized"""
+    normalized = ' '.join(text.lower().split())
+    return hashlib.blake2b(normalized.encode(), digest_size=8).digest()
+
+def _cache_put(cache: Dict, key, value):
+    """Insert into a memo dict, evicting the oldest entry once it is full"""
+    if len(cache) >= _CACHE_MAX_ENTRIES:
+        del cache[next(iter(cache))]
+    cache[key] = value
+
 class LLMProcessor:
     """Handles LLM integration for data enrichment"""
     
-    def __init__(self, model_name: str = "microsoft/DialoGPT-medium"):
+    def __init__(self, model_name: str = "valhalla/distilbart-mnli-12-3"):
         self.model_name = model_name
-        self.generator = None
+        self.classifier = None
         self.tokenizer = None
         self.model = None
+        self._on_cuda = False  # Set once the model is loaded onto a GPU
         
         # Industry categories for classification
         self.industry_categories = [
@@ -44,6 +146,13 @@ class LLMProcessor:
             'Agriculture', 'Automotive', 'Aerospace', 'Tourism'
         ]
         
+        # Results memoized by normalized-description hash
+        self._industry_cache: Dict[bytes, str] = {}
+        self._keyword_cache: Dict[tuple, str] = {}
+        
+        # Single-pass matcher for rule-based classification
+        self._keyword_automaton = _build_keyword_automaton() if AHOCORASICK_AVAILABLE else None
+        
         if TRANSFORMERS_AVAILABLE:
             self.setup_model()
         else:
@@ -54,114 +163,165 @@ class LLMProcessor:
         try:
             logger.info(f"Loading LLM model: {self.model_name}")
             
-            # For lightweight deployment, we'll use a simple approach
-            # In production, consider using larger models like Llama-2 or Mistral
+            # An NLI model scores every industry label in a single forward pass,
+            # instead of generating free text and matching labels back out of it
             self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
             
-            # Add padding token if not present
-            if self.tokenizer.pad_token is None:
-                self.tokenizer.pad_token = self.tokenizer.eos_token
-            
-            self.model = AutoModelForCausalLM.from_pretrained(
+            self.model = AutoModelForSequenceClassification.from_pretrained(
                 self.model_name,
                 torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
-                device_map="auto" if torch.cuda.is_available() else None
+                device_map="auto" if torch.cuda.is_available() else None,
+                quantization_config=self._get_quantization_config()
             )
             
-            # Setup text generation pipeline
-            self.generator = pipeline(
-                'text-generation',
+            self._on_cuda = next(self.model.parameters()).device.type == 'cuda'
+            
+            # Setup zero-shot classification pipeline
+            self.classifier = pipeline(
+                'zero-shot-classification',
                 model=self.model,
-                tokenizer=self.tokenizer,
-                max_length=150,
-                temperature=0.7,
-                do_sample=True,
-                pad_token_id=self.tokenizer.eos_token_id
+                tokenizer=self.tokenizer
             )
             
             logger.info(f"LLM model {self.model_name} loaded successfully")
             
         except Exception as e:
             logger.error(f"Failed to load LLM model: {e}")
-            self.generator = None
+            self.classifier = None
             logger.info("Falling back to rule-based classification")
     
+    def _get_quantization_config(self):
+        """Weight quantization settings for GPU inference, or None to load full precision"""
+        mode = config.llm.quantization.lower()
+        if mode in ("", "none"):
+            return None
+        if mode not in ("4bit", "8bit"):
+            logger.warning(f"Unknown LLM quantization '{mode}'. Loading model without quantization.")
+            return None
+        if not torch.cuda.is_available():
+            logger.info(f"{mode} quantization needs CUDA. Loading model without quantization.")
+            return None
+        if not BITSANDBYTES_AVAILABLE:
+            logger.warning("bitsandbytes not available. Loading model without quantization.")
+            return None
+        
+        logger.info(f"Quantizing LLM weights to {mode}")
+        if mode == "8bit":
+            return BitsAndBytesConfig(load_in_8bit=True)
+        return BitsAndBytesConfig(
+            load_in_4bit=True,
+            bnb_4bit_compute_dtype=torch.float16,
+            bnb_4bit_quant_type="nf4"
+        )
+    
     def classify_industry(self, company_description: str, company_name: str = "") -> str:
         """Classify company industry using LLM or fallback methods"""
+        return self.classify_industry_batch([company_description], [company_name])[0]
+    
+    def classify_industry_batch(self, company_descriptions: List[str],
+                                company_names: Optional[List[str]] = None) -> List[str]:
+        """Classify many companies, sending all LLM-eligible ones through the model together"""
+        if company_names is None:
+            company_names = [""] * len(company_descriptions)
         
         # Combine company name and description for better context
-        full_description = f"{company_name} {company_description}".strip()
+        full_descriptions = [
+            f"{name} {description}".strip()
+            for name, description in zip(company_names, company_descriptions)
+        ]
         
-        if self.generator and len(full_description) > 10:
-            return self._classify_with_llm(full_description)
-        else:
-            return self._classify_with_rules(full_description)
+        # Templated pages repeat descriptions, so classify each distinct one once
+        keys = [_description_key(text) for text in full_descriptions]
+        results = {}
+        pending = {}
+        for key, text in zip(keys, full_descriptions):
+            if key in results or key in pending:
+                continue
+            cached = self._industry_cache.get(key)
+            if cached is not None:
+                results[key] = cached
+            else:
+                pending[key] = text
+        
+        if pending:
+            pending_keys = list(pending)
+            pending_texts = list(pending.values())
+            industries = [None] * len(pending_texts)
+            if self.classifier:
+                llm_indices = [i for i, text in enumerate(pending_texts) if len(text) > 10]
+                if llm_indices:
+                    llm_results = self._classify_with_llm_batch([pending_texts[i] for i in llm_indices])
+                    for i, industry in zip(llm_indices, llm_results):
+                        industries[i] = industry
+            
+            for key, industry, text in zip(pending_keys, industries, pending_texts):
+                results[key] = industry if industry is not None else self._classify_with_rules(text)
+            
+            # Answers come from the local results; the bounded cache may evict while filling
+            for key in pending_keys:
+                _cache_put(self._industry_cache, key, results[key])
+        
+        return [results[key] for key in keys]
     
     def _classify_with_llm(self, description: str) -> str:
         """Classify industry using LLM"""
+        return self._classify_with_llm_batch([description])[0]
+    
+    def _classify_with_llm_batch(self, descriptions: List[str]) -> List[str]:
+        """Classify industries with one batched zero-shot call"""
+        batch_size = config.llm.batch_size
+        
         try:
-            # Create a focused prompt for industry classification
-            prompt = f"""Based on the company description below, classify it into ONE of these industries:
-{', '.join(self.industry_categories)}
-
-Company description: {description[:200]}
-
-The industry is:"""
-            
-            # Generate response
-            result = self.generator(
-                prompt, 
-                max_length=len(prompt.split()) + 15,
-                num_return_sequences=1,
-                temperature=0.3  # Lower temperature for more focused results
-            )
-            
-            response = result[0]['generated_text'][len(prompt):].strip()
+            while True:
+                try:
+                    with torch.inference_mode():
+                        results = self.classifier(
+                            [description[:200] for description in descriptions],
+                            candidate_labels=self.industry_categories,
+                            hypothesis_template="This company operates in the {} industry.",
+                            multi_label=False,
+                            batch_size=batch_size
+                        )
+                    break
+                except torch.cuda.OutOfMemoryError:
+                    if batch_size == 1:
+                        raise
+                    # Retry the same inputs with smaller forward passes
+                    batch_size //= 2
+                    torch.cuda.empty_cache()
+                    logger.warning(f"LLM batch ran out of GPU memory, retrying with batch size {batch_size}")
             
-            # Extract industry from response
-            for industry in self.industry_categories:
-                if industry.lower() in response.lower():
-                    return industry
+            # A single input comes back as a bare dict
+            if isinstance(results, dict):
+                results = [results]
             
-            # Fallback to rule-based if LLM doesn't return valid industry
-            return self._classify_with_rules(description)
+            # Labels are sorted by score, best first
+            return [result['labels'][0] for result in results]
             
         except Exception as e:
             logger.error(f"LLM classification failed: {e}")
-            return self._classify_with_rules(description)
+            return [self._classify_with_rules(description) for description in descriptions]
     
     def _classify_with_rules(self, description: str) -> str:
         """Rule-based industry classification as fallback"""
         description_lower = description.lower()
         
-        # Define keyword patterns for each industry
-        industry_keywords = {
-            'Technology': ['software', 'tech', 'digital', 'computer', 'programming', 'app', 'web', 'it', 'cyber', 'data', 'ai', 'artificial intelligence'],
-            'Finance': ['bank', 'finance', 'investment', 'insurance', 'fund', 'capital', 'trading', 'financial', 'loan', 'credit'],
-            'Healthcare': ['health', 'medical', 'hospital', 'clinic', 'healthcare', 'pharmaceutical', 'drug', 'medicine', 'therapy'],
-            'Manufacturing': ['manufacturing', 'factory', 'production', 'industrial', 'machinery', 'equipment', 'assembly'],
-            'Retail': ['retail', 'shop', 'store', 'sales', 'commerce', 'trading', 'merchandise', 'goods'],
-            'Education': ['education', 'school', 'university', 'training', 'learning', 'academic', 'teaching', 'course'],
-            'Real Estate': ['real estate', 'property', 'housing', 'construction', 'building', 'development', 'land'],
-            'Transportation': ['transport', 'logistics', 'shipping', 'delivery', 'freight', 'cargo', 'aviation', 'maritime'],
-            'Food & Beverage': ['food', 'restaurant', 'catering', 'beverage', 'dining', 'culinary', 'cafe', 'bar'],
-            'Professional Services': ['consulting', 'advisory', 'legal', 'accounting', 'audit', 'professional', 'services'],
-            'Construction': ['construction', 'contractor', 'building', 'civil', 'engineering', 'infrastructure'],
-            'Media & Entertainment': ['media', 'entertainment', 'advertising', 'marketing', 'creative', 'design', 'agency'],
-            'Energy': ['energy', 'oil', 'gas', 'renewable', 'solar', 'power', 'utility', 'electricity'],
-            'Telecommunications': ['telecom', 'telecommunications', 'mobile', 'network', 'communication', 'broadband']
-        }
+        # Collect each keyword once, as the substring scan did
+        if self._keyword_automaton is not None:
+            matched = {keyword for _, keyword in self._keyword_automaton.iter(description_lower)}
+        else:
+            matched = {keyword for keyword in _KEYWORD_INDUSTRIES if keyword in description_lower}
         
         # Score each industry based on keyword matches
-        industry_scores = {}
-        for industry, keywords in industry_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in description_lower)
-            if score > 0:
-                industry_scores[industry] = score
+        industry_scores = dict.fromkeys(_INDUSTRY_KEYWORDS, 0)
+        for keyword in matched:
+            for industry in _KEYWORD_INDUSTRIES[keyword]:
+                industry_scores[industry] += 1
         
         # Return industry with highest score
-        if industry_scores:
-            return max(industry_scores, key=industry_scores.get)
+        best = max(industry_scores, key=industry_scores.get)
+        if industry_scores[best] > 0:
+            return best
         
         return "Professional Services"  # Default fallback
     
@@ -170,47 +330,40 @@ The industry is:"""
         if not text or len(text.strip()) < 10:
             return ""
         
+        cache_key = (_description_key(text), max_keywords)
+        keywords = self._keyword_cache.get(cache_key)
+        if keywords is not None:
+            return keywords
+        
         try:
             if NLTK_AVAILABLE:
-                return self._extract_keywords_nltk(text, max_keywords)
+                keywords = self._extract_keywords_nltk(text, max_keywords)
             else:
-                return self._extract_keywords_simple(text, max_keywords)
+                keywords = self._extract_keywords_simple(text, max_keywords)
                 
         except Exception as e:
             logger.error(f"Keyword extraction failed: {e}")
             return ""
+        
+        _cache_put(self._keyword_cache, cache_key, keywords)
+        return keywords
     
     def _extract_keywords_nltk(self, text: str, max_keywords: int) -> str:
         """Extract keywords using NLTK"""
         try:
-            # Download required NLTK data if not present
-            try:
-                nltk.data.find('corpora/stopwords')
-            except LookupError:
-                nltk.download('stopwords', quiet=True)
-            
-            try:
-                nltk.data.find('tokenizers/punkt')
-            except LookupError:
-                nltk.download('punkt', quiet=True)
-            
-            stop_words = set(stopwords.words('english'))
-            
-            # Add domain-specific stop words
-            stop_words.update({
-                'company', 'ltd', 'pte', 'singapore', 'services', 'solutions',
-                'group', 'holdings', 'international', 'private', 'limited'
-            })
-            
-            # Extract words (3+ characters, alphabetic)
-            words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
+            stop_words = _nltk_stop_words()
+            if stop_words is None:
+                return self._extract_keywords_simple(text, max_keywords)
             
-            # Filter stop words and common business terms
-            filtered_words = [word for word in words if word not in stop_words]
+            # Count words (3+ characters, alphabetic) that are not stop words
+            word_freq = {}
+            for match in _WORD_RE.finditer(text.lower()):
+                word = match.group()
+                if word not in stop_words:
+                    word_freq[word] = word_freq.get(word, 0) + 1
             
-            # Count frequency and get most common
-            word_freq = Counter(filtered_words)
-            keywords = [word for word, freq in word_freq.most_common(max_keywords)]
+            # Most frequent first; ties keep first-occurrence order
+            keywords = sorted(word_freq, key=word_freq.get, reverse=True)[:max_keywords]
             
             return ', '.join(keywords)
             
@@ -220,24 +373,16 @@ The industry is:"""
     
     def _extract_keywords_simple(self, text: str, max_keywords: int) -> str:
         """Simple keyword extraction without NLTK"""
-        # Basic stop words
-        stop_words = {
-            'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
-            'by', 'from', 'up', 'about', 'into', 'through', 'during', 'before',
-            'after', 'above', 'below', 'between', 'among', 'company', 'ltd', 'pte',
-            'singapore', 'services', 'solutions', 'group', 'holdings', 'international',
-            'private', 'limited', 'our', 'we', 'us', 'you', 'your', 'they', 'their'
-        }
-        
-        # Extract meaningful words
-        words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-        filtered_words = [word for word in words if word not in stop_words]
-        
-        # Get unique words (preserve order of first occurrence)
-        unique_words = list(dict.fromkeys(filtered_words))
+        # First max_keywords distinct words, in order of first occurrence
+        unique_words = {}
+        for match in _WORD_RE.finditer(text.lower()):
+            if len(unique_words) >= max_keywords:
+                break
+            word = match.group()
+            if word not in _SIMPLE_STOP_WORDS:
+                unique_words[word] = None
         
-        # Return first max_keywords words
-        return ', '.join(unique_words[:max_keywords])
+        return ', '.join(unique_words)
     
     def determine_company_size(self, employees: Optional[int], revenue: Optional[str], 
                               description: str = "") -> str:
@@ -256,78 +401,83 @@ The industry is:"""
         if revenue:
             revenue_lower = revenue.lower()
             # Look for revenue indicators
-            if any(indicator in revenue_lower for indicator in ['million', 'billion']):
-                if 'billion' in revenue_lower:
-                    return "Large"
-                elif 'million' in revenue_lower:
-                    # Extract number before million
-                    numbers = re.findall(r'(\d+(?:\.\d+)?)', revenue_lower)
-                    if numbers:
-                        try:
-                            amount = float(numbers[0])
-                            if amount >= 100:  # 100+ million
-                                return "Large"
-                            elif amount >= 10:  # 10-100 million
-                                return "Medium"
-                            else:
-                                return "Small"
-                        except ValueError:
-                            pass
+            if 'billion' in revenue_lower:
+                return "Large"
+            if 'million' in revenue_lower:
+                # First number in the text, taken as the amount in millions
+                number = _NUMBER_RE.search(revenue_lower)
+                if number:
+                    amount = float(number.group())
+                    if amount >= 100:  # 100+ million
+                        return "Large"
+                    elif amount >= 10:  # 10-100 million
+                        return "Medium"
+                    else:
+                        return "Small"
         
         # Tertiary classification by description keywords
         if description:
             description_lower = description.lower()
-            large_indicators = ['multinational', 'global', 'international', 'enterprise', 'corporation']
-            small_indicators = ['startup', 'boutique', 'local', 'family', 'small']
-            
-            if any(indicator in description_lower for indicator in large_indicators):
+            if any(indicator in description_lower for indicator in _LARGE_COMPANY_INDICATORS):
                 return "Large"
-            elif any(indicator in description_lower for indicator in small_indicators):
+            elif any(indicator in description_lower for indicator in _SMALL_COMPANY_INDICATORS):
                 return "Small"
         
         return "Unknown"
     
     def enhance_company_data(self, company_data: Dict) -> Dict:
         """Enhance company data using LLM processing"""
-        enhanced_data = company_data.copy()
-        
-        # Prepare description for LLM processing
-        description_parts = []
-        if company_data.get('services_offered'):
-            description_parts.append(company_data['services_offered'])
-        if company_data.get('products_offered'):
-            description_parts.append(company_data['products_offered'])
+        return self.enhance_companies_data([company_data])[0]
+    
+    def enhance_companies_data(self, companies: List[Dict]) -> List[Dict]:
+        """Enhance a batch of companies, classifying industries in one batched LLM call"""
+        enhanced_companies = [company_data.copy() for company_data in companies]
         
-        description = ' '.join(description_parts)
-        company_name = company_data.get('company_name', '')
+        # Prepare descriptions for LLM processing
+        descriptions = []
+        for company_data in companies:
+            description_parts = []
+            if company_data.get('services_offered'):
+                description_parts.append(company_data['services_offered'])
+            if company_data.get('products_offered'):
+                description_parts.append(company_data['products_offered'])
+            descriptions.append(' '.join(description_parts))
         
         # Industry classification
-        if not enhanced_data.get('industry') and description:
-            enhanced_data['industry'] = self.classify_industry(description, company_name)
-        
-        # Keyword extraction
-        if not enhanced_data.get('keywords') and description:
-            enhanced_data['keywords'] = self.extract_keywords(description)
-        
-        # Company size determination
-        if not enhanced_data.get('company_size'):
-            enhanced_data['company_size'] = self.determine_company_size(
-                enhanced_data.get('number_of_employees'),
-                enhanced_data.get('revenue'),
-                description
+        to_classify = [
+            i for i, (enhanced_data, description) in enumerate(zip(enhanced_companies, descriptions))
+            if not enhanced_data.get('industry') and description
+        ]
+        if to_classify:
+            industries = self.classify_industry_batch(
+                [descriptions[i] for i in to_classify],
+                [companies[i].get('company_name', '') for i in to_classify]
             )
+            for i, industry in zip(to_classify, industries):
+                enhanced_companies[i]['industry'] = industry
         
-        return enhanced_data
+        for enhanced_data, description in zip(enhanced_companies, descriptions):
+            # Keyword extraction
+            if not enhanced_data.get('keywords') and description:
+                enhanced_data['keywords'] = self.extract_keywords(description)
+            
+            # Company size determination
+            if not enhanced_data.get('company_size'):
+                enhanced_data['company_size'] = self.determine_company_size(
+                    enhanced_data.get('number_of_employees'),
+                    enhanced_data.get('revenue'),
+                    description
+                )
+        
+        return enhanced_companies
     
     def cleanup(self):
         """Clean up model resources"""
-        if self.model:
-            del self.model
-        if self.tokenizer:
-            del self.tokenizer
-        if self.generator:
-            del self.generator
+        self.model = None
+        self.tokenizer = None
+        self.classifier = None
         
-        # Clear CUDA cache if using GPU
-        if torch.cuda.is_available():
-            torch.cuda.empty_cache()
\ No newline at end of file
+        # Clear CUDA cache only if the model actually lived on the GPU
+        if self._on_cuda:
+            torch.cuda.empty_cache()
+            self._on_cuda = False
\ No newline at end of file
@@ -2,17 +2,24 @@
 # Main entry point for the Singapore Company ETL Pipeline
 
 import argparse
+import atexit
+import importlib.util
+import queue
 import sys
 import logging
+import logging.handlers
 import signal
+import sqlite3
+from contextlib import closing
+from dataclasses import replace
 from pathlib import Path
 from datetime import datetime
 
 # Add current directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
-# Import our modules
-from main_etl import SGCompanyETL
+# Import our modules (main_etl pulls in pandas, numpy and aiohttp, so it is imported
+# only once arguments are parsed and --help/--version have already returned)
 from config import config
 
 def setup_logging(log_level: str = "INFO"):
@@ -21,72 +28,42 @@ def setup_logging(log_level: str = "INFO"):
     logs_dir = Path("logs")
     logs_dir.mkdir(exist_ok=True)
     
-    # Setup logging
+    # Skip per-record thread/process bookkeeping the format never prints
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    
+    # Setup logging; second-resolution timestamps skip the milliseconds formatting step
     log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    date_format = '%Y-%m-%d %H:%M:%S'
     
-    # File handler
+    # File handler, buffered so records are written in blocks (flushed at once on errors)
     file_handler = logging.FileHandler(
         logs_dir / f"etl_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
     )
     file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(logging.Formatter(log_format))
+    file_handler.setFormatter(logging.Formatter(log_format, datefmt=date_format))
+    buffered_file_handler = logging.handlers.MemoryHandler(
+        capacity=1024, flushLevel=logging.ERROR, target=file_handler
+    )
     
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(getattr(logging, log_level.upper()))
-    console_handler.setFormatter(logging.Formatter(log_format))
-    
-    # Root logger
-    root_logger = logging.getLogger()
-    root_logger.setLevel(logging.DEBUG)
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
+    console_handler.setFormatter(logging.Formatter(log_format, datefmt=date_format))
     
-    return root_logger
-
-# main.py
-# Main entry point for the Singapore Company ETL Pipeline
-
-import argparse
-import sys
-import logging
-import signal
-from pathlib import Path
-from datetime import datetime
-
-# Add current directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent))
-
-# Import our modules
-from main_etl import SGCompanyETL
-from config import config
-
-def setup_logging(log_level: str = "INFO"):
-    """Setup logging configuration"""
-    # Create logs directory
-    logs_dir = Path("logs")
-    logs_dir.mkdir(exist_ok=True)
-    
-    # Setup logging
-    log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    
-    # File handler
-    file_handler = logging.FileHandler(
-        logs_dir / f"etl_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+    # Handlers run on a listener thread, so logging calls only enqueue the record
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(
+        log_queue, buffered_file_handler, console_handler, respect_handler_level=True
     )
-    file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(logging.Formatter(log_format))
-    
-    # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(getattr(logging, log_level.upper()))
-    console_handler.setFormatter(logging.Formatter(log_format))
+    listener.start()
+    atexit.register(listener.stop)
     
     # Root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.DEBUG)
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
     
     return root_logger
 
@@ -98,29 +75,23 @@ def signal_handler(signum, frame):
 
 def create_backup():
     """Create database backup"""
-    from database import DatabaseManager
+    db_path = config.database.path
     
     try:
-        db_manager = DatabaseManager()
-        if Path(db_manager.db_path).exists():
-            # Simple backup by copying file
-            backup_path = f"{db_manager.db_path}.backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            import shutil
-            shutil.copy2(db_manager.db_path, backup_path)
+        if Path(db_path).exists():
+            # Online backup API: page-by-page, consistent even while the DB is being written
+            backup_path = f"{db_path}.backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            with closing(sqlite3.connect(db_path)) as source_conn, closing(sqlite3.connect(backup_path)) as backup_conn:
+                source_conn.backup(backup_conn, pages=1024, sleep=0.01)
             print(f"Database backed up to: {backup_path}")
         else:
             print("No existing database found to backup")
     except Exception as e:
         print(f"Backup failed: {e}")
 
-def main():
-    """Main entry point for the ETL pipeline"""
-    
-    # Setup signal handlers for graceful shutdown
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
-    
-    # Parse command line arguments
+def build_parser() -> argparse.ArgumentParser:
+    """Command line interface"""
+    etl_config = config.etl
     parser = argparse.ArgumentParser(
         description="Singapore Company ETL Pipeline",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -136,15 +107,15 @@ Examples:
     parser.add_argument(
         "--target-count", 
         type=int, 
-        default=config.etl.target_company_count,
-        help=f"Target number of companies to extract (default: {config.etl.target_company_count})"
+        default=etl_config.target_company_count,
+        help=f"Target number of companies to extract (default: {etl_config.target_company_count})"
     )
     
     parser.add_argument(
         "--batch-size", 
         type=int, 
-        default=config.etl.batch_size,
-        help=f"Batch size for processing (default: {config.etl.batch_size})"
+        default=etl_config.batch_size,
+        help=f"Batch size for processing (default: {etl_config.batch_size})"
     )
     
     parser.add_argument(
@@ -159,6 +130,12 @@ Examples:
         help="Skip LLM enrichment (faster execution)"
     )
     
+    parser.add_argument(
+        "--no-cache", 
+        action="store_true",
+        help="Ignore cached website searches and pages from earlier runs"
+    )
+    
     parser.add_argument(
         "--dry-run", 
         action="store_true",
@@ -184,7 +161,17 @@ Examples:
         version="Singapore Company ETL Pipeline v1.0.0"
     )
     
-    args = parser.parse_args()
+    return parser
+
+def main():
+    """Main entry point for the ETL pipeline"""
+    
+    # Setup signal handlers for graceful shutdown
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+    
+    # Parse command line arguments
+    args = build_parser().parse_args()
     
     # Setup logging
     logger = setup_logging(args.log_level)
@@ -207,14 +194,20 @@ Examples:
         create_backup()
     
     # Update configuration based on arguments
-    config.etl.target_company_count = args.target_count
-    config.etl.batch_size = args.batch_size
-    config.etl.enable_website_scraping = not args.skip_scraping
-    config.etl.enable_llm_enrichment = not args.skip_llm
+    config.etl = replace(
+        config.etl,
+        target_company_count=args.target_count,
+        batch_size=args.batch_size,
+        enable_website_scraping=not args.skip_scraping,
+        enable_llm_enrichment=not args.skip_llm
+    )
+    if args.no_cache:
+        config.scraping = replace(config.scraping, use_cache=False)
     
     try:
         # Initialize and run ETL pipeline
         logger.info("Initializing ETL pipeline...")
+        from main_etl import SGCompanyETL
         etl = SGCompanyETL()
         
         if args.dry_run:
@@ -244,40 +237,29 @@ Examples:
 
 def check_dependencies():
     """Check if all required dependencies are available"""
-    missing_deps = []
-    
-    try:
-        import requests
-    except ImportError:
-        missing_deps.append("requests")
-    
-    try:
-        import pandas
-    except ImportError:
-        missing_deps.append("pandas")
-    
-    try:
-        from bs4 import BeautifulSoup
-    except ImportError:
-        missing_deps.append("beautifulsoup4")
+    # find_spec locates a package without importing it, so this check stays cheap
+    # even for torch/transformers
+    missing_deps = [
+        package for module, package in [
+            ("requests", "requests"),
+            ("pandas", "pandas"),
+            ("bs4", "beautifulsoup4"),
+            ("tqdm", "tqdm"),
+        ]
+        if importlib.util.find_spec(module) is None
+    ]
     
     # Optional dependencies
-    optional_missing = []
-    
-    try:
-        from selenium import webdriver
-    except ImportError:
-        optional_missing.append("selenium (for advanced web scraping)")
-    
-    try:
-        from transformers import pipeline
-    except ImportError:
-        optional_missing.append("transformers (for LLM features)")
-    
-    try:
-        from fuzzywuzzy import fuzz
-    except ImportError:
-        optional_missing.append("fuzzywuzzy (for better entity matching)")
+    optional_missing = [
+        description for module, description in [
+            ("selenium", "selenium (for advanced web scraping)"),
+            ("selectolax", "selectolax (for faster HTML parsing)"),
+            ("lxml", "lxml (for faster HTML parsing without selectolax)"),
+            ("transformers", "transformers (for LLM features)"),
+            ("rapidfuzz", "rapidfuzz (for better entity matching)"),
+        ]
+        if importlib.util.find_spec(module) is None
+    ]
     
     if missing_deps:
         print("❌ Missing required dependencies:")
@@ -2,28 +2,91 @@
 # Main ETL pipeline orchestrator for Singapore Company Database
 
 import logging
-import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict
-import concurrent.futures
+from functools import cached_property
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
 from pathlib import Path
 
+from tqdm import tqdm
+
 # Import our modules
 from config import config
 from models import CompanyData
 from database import DatabaseManager
 from dataextractor import SGDataExtractor
-from web_scraper import WebScraper
-from llm_processor import LLMProcessor
 from entity_matcher import EntityMatcher
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Handlers are configured by main.setup_logging
 logger = logging.getLogger(__name__)
 
+def _clean_text(value):
+    """Strip strings, mapping blank ones to None"""
+    if isinstance(value, str):
+        return value.strip() or None
+    return value
+
+def _clean_int(value):
+    """Integer fields; unparseable values become None"""
+    try:
+        return int(_clean_text(value))
+    except (ValueError, TypeError):
+        return None
+
+def _clean_url(value):
+    """Ensure URLs have proper protocol"""
+    value = _clean_text(value)
+    if isinstance(value, str) and not value.startswith(('http://', 'https://')):
+        return 'https://' + value
+    return value
+
+def _clean_uen(value):
+    """Clean UEN format"""
+    value = _clean_text(value)
+    if isinstance(value, str):
+        return value.upper()
+    return value
+
+# Per-field cleaners, resolved once per field instead of re-testing the field type per value
+_FIELD_CLEANERS = {
+    'founding_year': _clean_int,
+    'number_of_employees': _clean_int,
+    'website': _clean_url,
+    'linkedin': _clean_url,
+    'facebook': _clean_url,
+    'instagram': _clean_url,
+    'uen': _clean_uen,
+}
+
+# Source field -> CompanyData field; source fields mapped to None are dropped
+_SOURCE_FIELD_MAPPING = {
+    'uen': 'uen',
+    'entity_name': 'company_name',
+    'company_name': 'company_name',
+    'reg_street_name': None,  # Skip for now
+    'reg_postal_code': None,  # Skip for now
+    'primary_ssic_description': 'industry',
+    'website': 'website',
+    'linkedin': 'linkedin',
+    'facebook': 'facebook',
+    'instagram': 'instagram',
+    'contact_email': 'contact_email',
+    'contact_phone': 'contact_phone',
+    'founding_year': 'founding_year',
+    'number_of_employees': 'number_of_employees',
+    'company_size': 'company_size',
+    'services_offered': 'services_offered',
+    'products_offered': 'products_offered',
+    'keywords': 'keywords',
+    'source': 'source_of_data'
+}
+
+# (source field, CompanyData field, cleaner) for every kept field, resolved once at import
+_FIELD_MAPPING = tuple((source, target, _FIELD_CLEANERS.get(target, _clean_text)) for source, target in _SOURCE_FIELD_MAPPING.items() if target)
+
 class SGCompanyETL:
     """Main ETL pipeline orchestrator"""
     
@@ -33,12 +96,10 @@ class SGCompanyETL:
         # Initialize components
         self.db_manager = DatabaseManager(config.database.path)
         self.data_extractor = SGDataExtractor()
-        self.web_scraper = WebScraper(
-            headless=config.scraping.headless_browser,
-            use_selenium=config.etl.enable_website_scraping
+        self.entity_matcher = EntityMatcher(
+            config.data_quality.fuzzy_match_threshold,
+            max_workers=config.etl.max_workers
         )
-        self.llm_processor = LLMProcessor(config.llm.model_name) if config.etl.enable_llm_enrichment else None
-        self.entity_matcher = EntityMatcher(config.data_quality.fuzzy_match_threshold)
         
         # Performance tracking
         self.stats = {
@@ -54,6 +115,24 @@ class SGCompanyETL:
         
         logger.info("ETL Pipeline initialized successfully")
     
+    # Heavy components (browser driver, LLM weights) are built on first use only
+    @cached_property
+    def web_scraper(self):
+        from web_scraper import WebScraper
+        return WebScraper(
+            headless=config.scraping.headless_browser,
+            use_selenium=config.scraping.use_selenium,
+            cache_dir=config.scraping.cache_dir if config.scraping.use_cache else None,
+            retry_attempts=config.scraping.retry_attempts,
+            max_drivers=config.scraping.max_browsers,
+            parse_workers=config.scraping.parse_workers
+        )
+    
+    @cached_property
+    def llm_processor(self):
+        from llm_processor import LLMProcessor
+        return LLMProcessor(config.llm.model_name)
+    
     def run_pipeline(self, target_count: int = None) -> Dict:
         """Run the complete ETL pipeline"""
         if target_count is None:
@@ -70,18 +149,11 @@ class SGCompanyETL:
             raw_companies = self.extract_phase(target_count)
             self.stats['companies_extracted'] = len(raw_companies)
             
-            # Phase 2: Transform
+            # Phases 2-3: Transform and load, overlapped batch by batch
             logger.info("=" * 50)
-            logger.info("PHASE 2: DATA TRANSFORMATION")
+            logger.info("PHASE 2-3: DATA TRANSFORMATION AND LOADING")
             logger.info("=" * 50)
-            processed_companies = self.transform_phase(raw_companies)
-            self.stats['companies_processed'] = len(processed_companies)
-            
-            # Phase 3: Load
-            logger.info("=" * 50)
-            logger.info("PHASE 3: DATA LOADING")
-            logger.info("=" * 50)
-            loaded_count = self.load_phase(processed_companies)
+            loaded_count = self.transform_and_load_phase(raw_companies)
             self.stats['companies_loaded'] = loaded_count
             
             # Phase 4: Report
@@ -102,19 +174,19 @@ class SGCompanyETL:
         """Phase 1: Extract company data from various sources"""
         logger.info("Starting data extraction phase...")
         
-        all_companies = []
+        # The sources are independent, so the API fetch and the CSV download/parse overlap
+        logger.info("Extracting from Singapore government sources and CSV sources...")
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="etl-extract") as executor:
+            gov_future = executor.submit(
+                self.data_extractor.extract_companies_from_data_gov,
+                limit=target_count // 2
+            )
+            csv_future = executor.submit(self.data_extractor.extract_companies_from_csv_sources)
+            gov_companies = gov_future.result()
+            csv_companies = csv_future.result()
         
-        # Extract from government sources
-        logger.info("Extracting from Singapore government sources...")
-        gov_companies = self.data_extractor.extract_companies_from_data_gov(
-            limit=target_count // 2
-        )
-        all_companies.extend(gov_companies)
-        
-        # Extract from CSV sources
-        logger.info("Extracting from CSV sources...")
-        csv_companies = self.data_extractor.extract_companies_from_csv_sources()
-        all_companies.extend(csv_companies)
+        # Government records first, as before
+        all_companies = gov_companies + csv_companies
         
         # Limit to target count
         if len(all_companies) > target_count:
@@ -136,95 +208,121 @@ class SGCompanyETL:
         max_websites_to_scrape = min(len(companies), 200)  # Reasonable limit for demo
         companies_to_scrape = companies[:max_websites_to_scrape]
         
-        def scrape_single_company(company_data):
-            try:
-                company_name = company_data.get('company_name', '')
-                
-                # Find or generate website URL
-                website = company_data.get('website')
-                if not website:
-                    website = self.data_extractor.search_company_websites(company_name)
-                
+        # Probe candidate domains for every company missing a website in one async batch
+        missing_website = [company for company in companies_to_scrape if not company.get('website')]
+        if missing_website:
+            websites = self.data_extractor.search_company_websites_batch(
+                [company.get('company_name', '') for company in missing_website]
+            )
+            for company, website in zip(missing_website, websites):
                 if website:
-                    company_data['website'] = website
-                    
-                    # Scrape website for additional data
-                    scraped_data = self.web_scraper.scrape_company_website(website)
-                    
-                    # Merge scraped data
-                    for key, value in scraped_data.items():
-                        if value and not company_data.get(key):
-                            company_data[key] = value
-                    
-                    self.stats['websites_scraped'] += 1
-                    
-                    # Add delay to be respectful
-                    time.sleep(config.scraping.delay_between_requests)
-                
-                return company_data
-                
-            except Exception as e:
-                logger.error(f"Error scraping website for {company_name}: {e}")
-                return company_data
-        
-        # Process companies with limited concurrency
-        with concurrent.futures.ThreadPoolExecutor(max_workers=config.etl.max_workers) as executor:
-            # Submit jobs in batches
-            batch_size = config.etl.batch_size
-            enriched_companies = []
-            
-            for i in range(0, len(companies_to_scrape), batch_size):
-                batch = companies_to_scrape[i:i + batch_size]
-                
-                logger.info(f"Processing website batch {i//batch_size + 1} ({len(batch)} companies)")
-                
-                # Submit batch jobs
-                future_to_company = {
-                    executor.submit(scrape_single_company, company): company 
-                    for company in batch
-                }
-                
-                # Collect results
-                for future in concurrent.futures.as_completed(future_to_company):
-                    try:
-                        enriched_company = future.result(timeout=60)
-                        enriched_companies.append(enriched_company)
-                    except Exception as e:
-                        original_company = future_to_company[future]
-                        logger.error(f"Failed to process company {original_company.get('company_name')}: {e}")
-                        enriched_companies.append(original_company)
+                    company['website'] = website
+        
+        # Scrape every known website concurrently on one event loop
+        with_website = [company for company in companies_to_scrape if company.get('website')]
+        logger.info(f"Scraping {len(with_website)} company websites")
+        scraped_results = self.web_scraper.scrape_company_websites(
+            [company['website'] for company in with_website],
+            max_concurrency=config.etl.max_workers,
+            delay=config.scraping.delay_between_requests
+        )
+        
+        # Merge scraped data
+        for company_data, scraped_data in zip(with_website, scraped_results):
+            for key, value in scraped_data.items():
+                if value and not company_data.get(key):
+                    company_data[key] = value
+        self.stats['websites_scraped'] += len(with_website)
         
         # Add remaining companies that weren't scraped
-        enriched_companies.extend(companies[max_websites_to_scrape:])
+        enriched_companies = companies_to_scrape + companies[max_websites_to_scrape:]
         
         logger.info(f"Website enrichment completed. Scraped {self.stats['websites_scraped']} websites")
         return enriched_companies
     
-    def transform_phase(self, companies: List[Dict]) -> List[CompanyData]:
-        """Phase 2: Transform and enrich company data"""
+    def transform_phase(self, companies: List[Dict]) -> Iterator[List[CompanyData]]:
+        """Phase 2: Deduplicate, then enrich and convert one batch at a time"""
         logger.info("Starting data transformation phase...")
         
-        # Step 1: Entity matching and deduplication
+        # Matching needs every company at once; enrichment and conversion can stream
+        deduplicated_companies = self.deduplicate_companies(companies)
+        
+        batch_size = config.etl.batch_size
+        for i in range(0, len(deduplicated_companies), batch_size):
+            company_objects = self.transform_batch(deduplicated_companies[i:i + batch_size])
+            self.stats['companies_processed'] += len(company_objects)
+            yield company_objects
+        
+        logger.info(f"Transformation completed. Processed {self.stats['companies_processed']} companies")
+    
+    def transform_and_load_phase(self, companies: List[Dict]) -> int:
+        """Phases 2-3: Transform batches on a worker thread while earlier ones load"""
+        transformed_batches = queue.Queue(maxsize=2)  # Bounded so transform cannot run far ahead of loading
+        loading_stopped = threading.Event()  # Set once nothing will consume the queue any more
+        transform_errors = []
+        
+        def hand_off(item) -> bool:
+            """Queue an item for the loader, giving up if loading has stopped"""
+            while not loading_stopped.is_set():
+                try:
+                    transformed_batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def transform_worker():
+            try:
+                for company_objects in self.transform_phase(companies):
+                    if not hand_off(company_objects):
+                        break
+            except Exception as e:
+                transform_errors.append(e)
+            finally:
+                hand_off(None)
+        
+        worker = threading.Thread(target=transform_worker, name="etl-transform", daemon=True)
+        worker.start()
+        try:
+            loaded_count = self.load_phase(iter(transformed_batches.get, None), incoming_rows=len(companies))
+        finally:
+            # A failed load leaves the queue unread; release the worker before joining it
+            loading_stopped.set()
+            worker.join()
+        
+        if transform_errors:
+            raise transform_errors[0]
+        
+        return loaded_count
+    
+    def deduplicate_companies(self, companies: List[Dict]) -> List[Dict]:
+        """Entity matching and deduplication over the full extract"""
         logger.info("Performing entity matching and deduplication...")
         original_count = len(companies)
         deduplicated_companies = self.entity_matcher.fuzzy_match_companies(companies)
         self.stats['duplicates_removed'] = original_count - len(deduplicated_companies)
         
         logger.info(f"Removed {self.stats['duplicates_removed']} duplicates")
-        
-        # Step 2: LLM enrichment
-        if self.llm_processor and config.etl.enable_llm_enrichment:
+        return deduplicated_companies
+    
+    def transform_batch(self, companies: List[Dict]) -> List[CompanyData]:
+        """LLM-enrich, clean and convert a batch of deduplicated companies"""
+        # LLM enrichment
+        if config.etl.enable_llm_enrichment:
             logger.info("Performing LLM enrichment...")
-            deduplicated_companies = self.llm_enrichment(deduplicated_companies)
+            companies = self.llm_enrichment(companies)
         
-        # Step 3: Convert to CompanyData objects
+        # Convert to CompanyData objects
         logger.info("Converting to standardized format...")
         company_objects = []
+        # One clock read for the batch instead of one per CompanyData.__post_init__
+        extraction_timestamp = datetime.now().isoformat()
         
-        for company_dict in deduplicated_companies:
+        for company_dict in companies:
             try:
                 # Clean and standardize data
                 cleaned_data = self.clean_company_data(company_dict)
+                cleaned_data.setdefault('extraction_timestamp', extraction_timestamp)
                 
                 # Create CompanyData object
                 company_obj = CompanyData(**cleaned_data)
@@ -233,25 +331,26 @@ class SGCompanyETL:
             except Exception as e:
                 logger.error(f"Error converting company {company_dict.get('company_name', 'Unknown')}: {e}")
         
-        logger.info(f"Transformation completed. Processed {len(company_objects)} companies")
         return company_objects
     
     def llm_enrichment(self, companies: List[Dict]) -> List[Dict]:
-        """Enrich companies using LLM"""
+        """Enrich companies using LLM, one batched model call per chunk"""
         enriched_companies = []
+        batch_size = config.llm.batch_size
         
-        for i, company in enumerate(companies):
-            try:
-                if i % 50 == 0:
-                    logger.info(f"LLM enrichment progress: {i}/{len(companies)}")
-                
-                enriched_company = self.llm_processor.enhance_company_data(company)
-                enriched_companies.append(enriched_company)
-                self.stats['llm_enrichments'] += 1
+        # One throttled progress bar instead of periodic progress log lines
+        with tqdm(total=len(companies), desc="LLM enrichment", unit="company", mininterval=0.5, leave=False) as progress:
+            for i in range(0, len(companies), batch_size):
+                batch = companies[i:i + batch_size]
+                try:
+                    enriched_companies.extend(self.llm_processor.enhance_companies_data(batch))
+                    self.stats['llm_enrichments'] += len(batch)
+                    
+                except Exception as e:
+                    logger.error(f"LLM enrichment failed for batch starting at {batch[0].get('company_name')}: {e}")
+                    enriched_companies.extend(batch)
                 
-            except Exception as e:
-                logger.error(f"LLM enrichment failed for {company.get('company_name')}: {e}")
-                enriched_companies.append(company)
+                progress.update(len(batch))
         
         logger.info(f"LLM enrichment completed for {self.stats['llm_enrichments']} companies")
         return enriched_companies
@@ -261,33 +360,10 @@ class SGCompanyETL:
         cleaned = {}
         
         # Map and clean fields
-        field_mapping = {
-            'uen': 'uen',
-            'entity_name': 'company_name',
-            'company_name': 'company_name',
-            'reg_street_name': None,  # Skip for now
-            'reg_postal_code': None,  # Skip for now
-            'primary_ssic_description': 'industry',
-            'website': 'website',
-            'linkedin': 'linkedin',
-            'facebook': 'facebook',
-            'instagram': 'instagram',
-            'contact_email': 'contact_email',
-            'contact_phone': 'contact_phone',
-            'founding_year': 'founding_year',
-            'number_of_employees': 'number_of_employees',
-            'company_size': 'company_size',
-            'services_offered': 'services_offered',
-            'products_offered': 'products_offered',
-            'keywords': 'keywords',
-            'source': 'source_of_data'
-        }
-        
-        for source_field, target_field in field_mapping.items():
-            if target_field and source_field in company_dict:
-                value = company_dict[source_field]
-                if value:
-                    cleaned[target_field] = self.clean_field_value(target_field, value)
+        for source_field, target_field, clean in _FIELD_MAPPING:
+            value = company_dict.get(source_field)
+            if value:
+                cleaned[target_field] = clean(value)
         
         # Set defaults
         cleaned['hq_country'] = 'Singapore'
@@ -296,58 +372,58 @@ class SGCompanyETL:
     
     def clean_field_value(self, field_name: str, value) -> any:
         """Clean individual field values"""
-        if value is None:
-            return None
-        
-        # Convert to string for text processing
-        if isinstance(value, str):
-            value = value.strip()
-            if not value:
-                return None
-        
-        # Field-specific cleaning
-        if field_name in ['founding_year', 'number_of_employees']:
-            try:
-                return int(value)
-            except (ValueError, TypeError):
-                return None
-        
-        elif field_name in ['website', 'linkedin', 'facebook', 'instagram']:
-            # Ensure URLs have proper protocol
-            if isinstance(value, str) and value:
-                if not value.startswith(('http://', 'https://')):
-                    value = 'https://' + value
-                return value
-        
-        elif field_name == 'uen':
-            # Clean UEN format
-            if isinstance(value, str):
-                return value.upper().strip()
-        
-        return value
+        return _FIELD_CLEANERS.get(field_name, _clean_text)(value)
     
-    def load_phase(self, companies: List[CompanyData]) -> int:
-        """Phase 3: Load data into database"""
+    def load_phase(self, batches: Iterable[List[CompanyData]], incoming_rows: Optional[int] = None) -> int:
+        """Phase 3: Load batches of companies into the database as they arrive"""
         logger.info("Starting data loading phase...")
         
+        # Into an empty table, or one the load will grow substantially, secondary indexes
+        # are rebuilt once afterwards instead of maintained per row
+        rebuild_indexes = self.db_manager.bulk_load_rebuilds_indexes(incoming_rows)
+        
         try:
-            # Batch insert for better performance
-            batch_size = config.etl.batch_size
+            if rebuild_indexes:
+                self.db_manager.drop_secondary_indexes()
+            else:
+                # Normally a no-op; restores indexes a failed earlier run left missing
+                self.db_manager.create_secondary_indexes()
+            
+            # Batch insert for better performance, several batches per commit
             total_loaded = 0
+            numbered_batches = enumerate(batches, 1)
             
-            for i in range(0, len(companies), batch_size):
-                batch = companies[i:i + batch_size]
-                loaded_count = self.db_manager.insert_companies_batch(batch)
-                total_loaded += loaded_count
+            while True:
+                # Collect the group first so the write lock is not held while batches are transformed
+                commit_group = list(islice(numbered_batches, config.database.batches_per_commit))
+                if not commit_group:
+                    break
                 
-                logger.info(f"Loaded batch {i//batch_size + 1}: {loaded_count} companies")
-            
-            logger.info(f"Data loading completed. Loaded {total_loaded} companies")
-            return total_loaded
+                with self.db_manager.transaction():
+                    for batch_number, batch in commit_group:
+                        loaded_count = self.db_manager.insert_companies_batch(batch)
+                        total_loaded += loaded_count
+                        
+                        logger.info(f"Loaded batch {batch_number}: {loaded_count} companies")
+                
+                if len(commit_group) < config.database.batches_per_commit:
+                    break
             
         except Exception as e:
             logger.error(f"Error in load phase: {e}")
+            if rebuild_indexes:
+                # Best effort: put the indexes back without masking the load error
+                try:
+                    self.db_manager.create_secondary_indexes()
+                except Exception as index_error:
+                    logger.error(f"Could not rebuild secondary indexes: {index_error}")
             raise
+        
+        if rebuild_indexes:
+            self.db_manager.finalize_indexes()
+        
+        logger.info(f"Data loading completed. Loaded {total_loaded} companies")
+        return total_loaded
     
     def generate_final_report(self):
         """Generate final ETL report"""
@@ -387,10 +463,11 @@ class SGCompanyETL:
         logger.info("Cleaning up resources...")
         
         try:
-            if self.web_scraper:
+            # Only components that were actually constructed need releasing
+            if 'web_scraper' in self.__dict__:
                 self.web_scraper.close()
             
-            if self.llm_processor:
+            if 'llm_processor' in self.__dict__:
                 self.llm_processor.cleanup()
             
         except Exception as e:
@@ -408,7 +485,10 @@ class SGCompanyETL:
         logger.info(f"Would extract {len(companies)} companies")
         
         # Transform
-        processed_companies = self.transform_phase(companies[:10])  # Limit for dry run
+        processed_companies = [
+            company for batch in self.transform_phase(companies[:10])  # Limit for dry run
+            for company in batch
+        ]
         logger.info(f"Would process {len(processed_companies)} companies")
         
         # Show sample data
@@ -1,11 +1,12 @@
 # models.py
 # Data models for the Singapore Company ETL Pipeline
 
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from typing import Optional
 from datetime import datetime
+from operator import attrgetter
 
-@dataclass
+@dataclass(slots=True)
 class CompanyData:
     """Data class for company information"""
     # Core identifiers
@@ -53,15 +54,19 @@ class CompanyData:
     
     def to_dict(self) -> dict:
         """Convert to dictionary"""
-        return {k: v for k, v in self.__dict__.items() if v is not None}
+        return {k: v for k, v in zip(COMPANY_FIELDS, _get_company_fields(self)) if v is not None}
     
     def calculate_completeness_score(self) -> float:
         """Calculate data completeness score (0-100)"""
-        total_fields = len(self.__dataclass_fields__)
-        populated_fields = sum(1 for v in self.__dict__.values() if v is not None)
-        return (populated_fields / total_fields) * 100
+        populated_fields = _COMPANY_FIELD_COUNT - _get_company_fields(self).count(None)
+        return (populated_fields / _COMPANY_FIELD_COUNT) * 100
 
-@dataclass
+# Field names in declaration order; attrgetter reads them all in one C-level call
+COMPANY_FIELDS = tuple(f.name for f in fields(CompanyData))
+_get_company_fields = attrgetter(*COMPANY_FIELDS)
+_COMPANY_FIELD_COUNT = len(COMPANY_FIELDS)
+
+@dataclass(slots=True)
 class DataSource:
     """Data source tracking"""
     source_name: str
@@ -74,7 +79,7 @@ class DataSource:
         if self.extraction_timestamp is None:
             self.extraction_timestamp = datetime.now().isoformat()
 
-@dataclass
+@dataclass(slots=True)
 class ValidationResult:
     """Validation result for data quality"""
     is_valid: bool
@@ -0,0 +1,7 @@
+# conftest.py
+# Make the top-level pipeline modules importable from the tests
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
\ No newline at end of file
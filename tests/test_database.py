@@ -0,0 +1,88 @@
+# test_database.py
+# Upsert and quality scoring behaviour of DatabaseManager
+
+import pytest
+
+from database import DatabaseManager
+from models import CompanyData
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "companies.db"))
+    yield manager
+    manager.close()
+
+
+def _row(db, uen):
+    return db.conn.execute(
+        "SELECT company_name, website, data_quality_score FROM companies WHERE uen = ?", (uen,)
+    ).fetchone()
+
+
+def test_batch_insert_scores_new_rows(db):
+    inserted = db.insert_companies_batch([
+        CompanyData(uen="U1", company_name="Alpha Pte Ltd"),
+        CompanyData(uen="U2", company_name="Beta Pte Ltd", website="https://beta.sg", industry="Retail"),
+    ])
+    
+    assert inserted == 2
+    assert db.get_company_count() == 2
+    assert _row(db, "U1")[2] == pytest.approx(20.0)
+    assert _row(db, "U2")[2] == pytest.approx(40.0)
+
+
+def test_batch_upsert_updates_and_rescores_existing_row(db):
+    db.insert_companies_batch([CompanyData(uen="U1", company_name="Alpha Pte Ltd")])
+    db.insert_companies_batch([
+        CompanyData(uen="U1", company_name="Alpha Holdings Pte Ltd", website="https://alpha.sg"),
+    ])
+    
+    assert db.get_company_count() == 1
+    assert _row(db, "U1") == ("Alpha Holdings Pte Ltd", "https://alpha.sg", pytest.approx(30.0))
+
+
+def test_batch_scores_rows_without_uen(db):
+    db.insert_companies_batch([CompanyData(uen="U1", company_name="Alpha Pte Ltd")])
+    db.insert_companies_batch([CompanyData(company_name="Nameless Pte Ltd", website="https://n.sg")])
+    
+    score = db.conn.execute(
+        "SELECT data_quality_score FROM companies WHERE uen IS NULL"
+    ).fetchone()[0]
+    assert score == pytest.approx(20.0)
+
+
+def test_batch_scoring_leaves_other_rows_alone(db):
+    db.insert_companies_batch([CompanyData(uen="U1", company_name="Alpha Pte Ltd")])
+    # A stale score on an untouched row shows the batch did not rescore the whole table
+    db.conn.execute("UPDATE companies SET data_quality_score = -1 WHERE uen = 'U1'")
+    db.insert_companies_batch([CompanyData(uen="U2", company_name="Beta Pte Ltd")])
+    
+    assert _row(db, "U1")[2] == -1
+    assert _row(db, "U2")[2] == pytest.approx(20.0)
+
+
+def test_batches_inside_transaction_commit_together(db):
+    with db.transaction():
+        db.insert_companies_batch([CompanyData(uen="U1", company_name="Alpha Pte Ltd")])
+        db.insert_companies_batch([CompanyData(uen="U1", company_name="Alpha Pte Ltd", industry="Retail")])
+    
+    assert db.get_company_count() == 1
+    assert _row(db, "U1")[2] == pytest.approx(30.0)
+
+
+def test_single_insert_returns_existing_id_on_upsert(db):
+    first_id = db.insert_company(CompanyData(uen="U1", company_name="Alpha Pte Ltd"))
+    second_id = db.insert_company(CompanyData(uen="U1", company_name="Alpha Pte Ltd", website="https://a.sg"))
+    
+    assert first_id == second_id
+    assert _row(db, "U1")[2] == pytest.approx(30.0)
+
+
+def test_index_rebuild_only_for_empty_table_or_large_load(db):
+    assert db.bulk_load_rebuilds_indexes(None)
+    db.insert_companies_batch([CompanyData(uen=f"U{i}", company_name=f"Company {i}") for i in range(10)])
+    
+    assert not db.bulk_load_rebuilds_indexes(None)
+    assert not db.bulk_load_rebuilds_indexes(4)
+    assert db.bulk_load_rebuilds_indexes(5)
\ No newline at end of file
@@ -0,0 +1,206 @@
+# test_dataextractor.py
+# Data.gov.sg fetching and website search in SGDataExtractor
+
+import asyncio
+from dataclasses import replace
+
+import pytest
+
+import dataextractor
+from config import config
+from dataextractor import SGDataExtractor
+
+requires_aiohttp = pytest.mark.skipif(not dataextractor.AIOHTTP_AVAILABLE, reason="aiohttp not installed")
+
+
+@pytest.fixture
+def extractor(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "scraping", replace(config.scraping, cache_dir=str(tmp_path)))
+    extractor = SGDataExtractor()
+    probed = []
+    
+    async def fake_probe(company_name, session, semaphore):
+        probed.append(company_name)
+        if company_name.startswith("flaky"):
+            return None, False  # A candidate timed out
+        return (None if company_name.startswith("unknown") else f"https://www.{company_name.split()[0]}.sg"), True
+    
+    monkeypatch.setattr(extractor, "_probe_company_website", fake_probe)
+    extractor.probed = probed
+    return extractor
+
+
+@requires_aiohttp
+def test_batch_larger_than_cache_does_not_raise(extractor, monkeypatch):
+    # Regression: filling misses evicted keys before they were read back
+    monkeypatch.setattr(dataextractor, "_WEBSITE_CACHE_MAX_ENTRIES", 1)
+    
+    websites = extractor.search_company_websites_batch(["alpha Pte Ltd", "beta Pte Ltd", "unknown Pte Ltd"])
+    
+    assert websites == ["https://www.alpha.sg", "https://www.beta.sg", None]
+    assert len(extractor._website_cache) == 1
+
+
+@requires_aiohttp
+def test_repeated_names_probed_once(extractor):
+    websites = extractor.search_company_websites_batch(["alpha Pte Ltd", "ALPHA Pte Ltd ", "unknown Pte Ltd"])
+    again = extractor.search_company_websites_batch(["unknown Pte Ltd", "alpha Pte Ltd"])
+    
+    assert websites == ["https://www.alpha.sg", "https://www.alpha.sg", None]
+    assert again == [None, "https://www.alpha.sg"]
+    assert extractor.probed == ["alpha pte ltd", "unknown pte ltd"]
+    assert extractor.website_cache_stats == {'hits': 3, 'misses': 2}
+
+
+@requires_aiohttp
+def test_unsettled_misses_are_not_cached(extractor):
+    assert extractor.search_company_websites_batch(["flaky Pte Ltd", "unknown Pte Ltd"]) == [None, None]
+    extractor.search_company_websites_batch(["flaky Pte Ltd", "unknown Pte Ltd"])
+    
+    assert extractor.probed == ["flaky pte ltd", "unknown pte ltd", "flaky pte ltd"]
+
+
+@requires_aiohttp
+def test_no_cache_reprobes_and_overwrites_entries(extractor, monkeypatch):
+    extractor.search_company_websites_batch(["unknown Pte Ltd"])
+    extractor._website_cache.clear()
+    monkeypatch.setattr(config, "scraping", replace(config.scraping, use_cache=False))
+    
+    async def found(company_name, session, semaphore):
+        return "https://www.unknown.sg", True
+    
+    monkeypatch.setattr(extractor, "_probe_company_website", found)
+    assert extractor.search_company_websites_batch(["unknown Pte Ltd"]) == ["https://www.unknown.sg"]
+    
+    monkeypatch.setattr(config, "scraping", replace(config.scraping, use_cache=True))
+    assert extractor._load_cached_websites(["unknown pte ltd"]) == {"unknown pte ltd": "https://www.unknown.sg"}
+
+
+@requires_aiohttp
+def test_single_name_search_stays_synchronous(extractor):
+    assert extractor.search_company_websites("alpha Pte Ltd") == "https://www.alpha.sg"
+    assert extractor.search_company_websites("unknown Pte Ltd") is None
+
+
+@pytest.mark.parametrize("company_name, label", [
+    ("Acme Pte Ltd", "acme"),
+    ("A/B Trading Pte Ltd", "abtrading"),
+    ("Tan & Sons (S) Pte. Ltd.", "tansons"),
+    ("Ng Brothers Private Limited", "ngbrothers"),
+    ("Lim, Koh & Co.", "limkoh"),
+])
+def test_candidate_domains_use_a_valid_dns_label(company_name, label):
+    candidates = SGDataExtractor()._candidate_domains(company_name)
+    
+    assert candidates[0] == f"https://www.{label}.com.sg"
+    assert len(candidates) == 4
+
+
+@pytest.mark.parametrize("company_name", ["Pte. Ltd.", "(S) Pte Ltd", " & ", "x" * 64])
+def test_names_without_a_usable_label_are_not_probed(company_name):
+    extractor = SGDataExtractor()
+    
+    assert extractor._candidate_domains(company_name) == []
+    probe = extractor._probe_company_website(company_name, _FakeSession({}), asyncio.Semaphore(1))
+    assert asyncio.run(probe) == (None, True)
+
+
+@requires_aiohttp
+def test_persistent_cache_survives_memory_eviction(extractor, monkeypatch):
+    monkeypatch.setattr(dataextractor, "_WEBSITE_CACHE_MAX_ENTRIES", 1)
+    extractor.search_company_websites_batch(["alpha Pte Ltd", "beta Pte Ltd"])
+    
+    websites = extractor.search_company_websites_batch(["alpha Pte Ltd", "beta Pte Ltd"])
+    
+    assert websites == ["https://www.alpha.sg", "https://www.beta.sg"]
+    assert extractor.probed == ["alpha pte ltd", "beta pte ltd"]
+
+
+class _FakeResponse:
+    def __init__(self, status, delay):
+        self.status = status
+        self.delay = delay
+    
+    async def __aenter__(self):
+        await asyncio.sleep(self.delay)
+        if self.status is None:
+            raise asyncio.TimeoutError
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class _FakeSession:
+    """HEAD responses by URL as (status, delay in seconds); a None status times out"""
+    
+    def __init__(self, responses):
+        self.responses = responses
+    
+    def head(self, url, **kwargs):
+        return _FakeResponse(*self.responses.get(url, (404, 0)))
+
+
+@requires_aiohttp
+@pytest.mark.parametrize("responses, expected", [
+    # The slower, higher-priority .com.sg answer wins over a faster .com
+    ({"https://www.acme.com.sg": (200, 0.05), "https://acme.com": (200, 0)}, "https://www.acme.com.sg"),
+    # A failed higher-priority probe falls through to the next success in order
+    ({"https://www.acme.com.sg": (404, 0.05), "https://www.acme.sg": (200, 0.02), "https://acme.com": (200, 0)},
+     "https://www.acme.sg"),
+    ({}, None),
+])
+def test_website_search_prefers_highest_priority_success(responses, expected):
+    extractor = SGDataExtractor()
+    
+    async def search():
+        return await extractor._probe_company_website("Acme Pte Ltd", _FakeSession(responses), asyncio.Semaphore(10))
+    
+    assert asyncio.run(search()) == (expected, True)
+
+
+@requires_aiohttp
+@pytest.mark.parametrize("responses, expected", [
+    # A timeout leaves the miss unsettled
+    ({"https://www.acme.com.sg": (None, 0)}, (None, False)),
+    # A lower-priority success is still a settled answer
+    ({"https://www.acme.com.sg": (None, 0), "https://acme.com": (200, 0)}, ("https://acme.com", True)),
+])
+def test_unreachable_candidates_leave_misses_unsettled(responses, expected):
+    extractor = SGDataExtractor()
+    
+    async def search():
+        return await extractor._probe_company_website("Acme Pte Ltd", _FakeSession(responses), asyncio.Semaphore(10))
+    
+    assert asyncio.run(search()) == expected
+
+
+@pytest.mark.parametrize("resource_id", ['x" ; DROP TABLE t; --', "D_ABC", "d_1 2", ""])
+def test_malformed_resource_id_is_rejected_before_any_request(resource_id, monkeypatch):
+    extractor = SGDataExtractor()
+    monkeypatch.setattr(extractor.session, "get", lambda *args, **kwargs: pytest.fail("request sent"))
+    
+    with pytest.raises(ValueError):
+        extractor._fetch_data_gov_records(resource_id, 10)
+
+
+def test_well_formed_resource_id_reaches_bulk_endpoint(monkeypatch):
+    extractor = SGDataExtractor()
+    sent = {}
+    
+    class Response:
+        content = b'{"result": {"records": [{"uen": "U1", "entity_name": "Alpha Pte Ltd"}]}}'
+        
+        def raise_for_status(self):
+            pass
+    
+    def fake_get(url, params, timeout):
+        sent.update(params)
+        return Response()
+    
+    monkeypatch.setattr(extractor.session, "get", fake_get)
+    
+    df = extractor._fetch_data_gov_records("d_3f960c10fed6145404ca7b821f263b87", 10)
+    
+    assert sent == {'sql': 'SELECT * FROM "d_3f960c10fed6145404ca7b821f263b87" LIMIT 10'}
+    assert df.to_dict('records') == [{'uen': 'U1', 'company_name': 'Alpha Pte Ltd'}]
\ No newline at end of file
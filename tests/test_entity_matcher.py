@@ -0,0 +1,85 @@
+# test_entity_matcher.py
+# Deduplication behaviour of EntityMatcher
+
+import random
+import string
+
+import pytest
+
+import entity_matcher
+from entity_matcher import EntityMatcher
+
+
+def _companies():
+    names = ["Merlion Tech", "Golden Dragon Foods", "Orchid Logistics", "Jade Harbour Trading", "Pacific Star Media"]
+    trading_names = ["Sunrise Ventures", "Blue Ocean Capital", "Lion City Builders", "Evergreen Clinic", "Nova Robotics"]
+    companies = []
+    for i, (name, trading_name) in enumerate(zip(names, trading_names)):
+        domain = name.replace(' ', '').lower()
+        companies.append({'company_name': f"{name} Pte Ltd", 'uen': f"U{i}", 'website': None, 'keywords': 'a'})
+        # Suffix variant of the same company, known by its website
+        companies.append({'company_name': f"{name.upper()} Private Limited", 'uen': None,
+                          'website': f"https://{domain}.com.sg", 'keywords': 'b'})
+        # Different name, same website domain
+        companies.append({'company_name': f"{trading_name} Pte Ltd", 'uen': '',
+                          'website': f"https://www.{domain}.com.sg/about"})
+        # Different name, same UEN
+        companies.append({'company_name': f"{trading_name} Services", 'uen': f"U{i}"})
+    return companies
+
+
+def test_missing_keys_given_as_none_do_not_raise():
+    # Regression: None UEN/website values were .strip()-ed
+    matched = EntityMatcher().fuzzy_match_companies([
+        {'company_name': 'A Pte Ltd', 'website': None, 'uen': 'X'},
+        {'company_name': 'B Pte Ltd', 'website': 'https://b.sg', 'uen': None},
+    ])
+    
+    assert [company['company_name'] for company in matched] == ['A Pte Ltd', 'B Pte Ltd']
+
+
+def test_duplicates_merged_by_name_uen_and_domain():
+    matched = EntityMatcher().fuzzy_match_companies(_companies())
+    
+    assert len(matched) == 5
+    assert [company['uen'] for company in matched] == ["U0", "U1", "U2", "U3", "U4"]
+    assert matched[0]['website'] == "https://www.merliontech.com.sg/about"
+    assert matched[0]['keywords'] == "a, b"
+
+
+def test_lsh_blocking_matches_exhaustive_comparison():
+    companies = _companies()
+    
+    blocked = EntityMatcher(use_lsh_blocking=True).fuzzy_match_companies([dict(c) for c in companies])
+    exhaustive = EntityMatcher(use_lsh_blocking=False).fuzzy_match_companies([dict(c) for c in companies])
+    
+    assert blocked == exhaustive
+
+
+def test_sharded_matching_matches_sequential(monkeypatch):
+    rng = random.Random(7)
+    companies = []
+    for i in range(40):
+        name, trading_name = (''.join(rng.choice(string.ascii_lowercase) for _ in range(12)) for _ in range(2))
+        companies.append({'company_name': f"{name.title()} Pte Ltd", 'uen': f"U{i}"})
+        companies.append({'company_name': f"{name.upper()} Private Limited", 'website': f"https://{name}.sg"})
+        companies.append({'company_name': trading_name.title(), 'website': f"https://www.{name}.sg/contact"})
+    sequential = EntityMatcher(max_workers=1).fuzzy_match_companies([dict(c) for c in companies])
+    
+    monkeypatch.setattr(entity_matcher, "_MIN_PARALLEL_COMPANIES", 1)
+    monkeypatch.setattr(entity_matcher.os, "cpu_count", lambda: 4)
+    matcher = EntityMatcher(max_workers=4)
+    assert len(matcher._partition_by_blocking_keys(companies, 4)) > 1
+    sharded = matcher.fuzzy_match_companies([dict(c) for c in companies])
+    
+    assert sharded == sequential
+
+
+@pytest.mark.skipif(not entity_matcher.RAPIDFUZZ_AVAILABLE, reason="rapidfuzz not installed")
+def test_name_similarity_is_true_score_below_threshold():
+    matcher = EntityMatcher(threshold=85)
+    
+    score = matcher._calculate_name_similarity("Merlion Tech Pte Ltd", "Merlion Foods Pte Ltd")
+    
+    assert 0.0 < score < 85.0
+    assert matcher._calculate_name_similarity("Merlion Tech Pte Ltd", "MERLION TECH Private Limited") == 100.0
\ No newline at end of file
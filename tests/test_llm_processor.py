@@ -0,0 +1,69 @@
+# test_llm_processor.py
+# Model loading options and batched industry classification in LLMProcessor
+
+from dataclasses import replace
+from types import SimpleNamespace
+
+import pytest
+
+import llm_processor
+from config import config
+from llm_processor import LLMProcessor
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    # Rule-based path only; tests do not load model weights
+    monkeypatch.setattr(llm_processor, "TRANSFORMERS_AVAILABLE", False)
+    return LLMProcessor()
+
+
+def test_quantization_is_off_by_default(processor):
+    assert config.llm.quantization == "none"
+    assert processor._get_quantization_config() is None
+
+
+@pytest.mark.parametrize("cuda, bitsandbytes", [(False, True), (True, False)])
+def test_requested_quantization_skipped_without_cuda_or_bitsandbytes(processor, monkeypatch, cuda, bitsandbytes):
+    monkeypatch.setattr(config, "llm", replace(config.llm, quantization="4bit"))
+    monkeypatch.setattr(llm_processor, "torch", SimpleNamespace(cuda=SimpleNamespace(is_available=lambda: cuda)), raising=False)
+    monkeypatch.setattr(llm_processor, "BITSANDBYTES_AVAILABLE", bitsandbytes)
+    
+    assert processor._get_quantization_config() is None
+
+
+def test_batch_matches_single_classification(processor):
+    descriptions = ["software development and cloud data", "restaurant and catering", "bank loans"]
+    expected = [LLMProcessor().classify_industry(text) for text in descriptions]
+    
+    assert processor.classify_industry_batch(descriptions) == expected
+
+
+def test_batch_larger_than_cache_does_not_raise(processor, monkeypatch):
+    # Regression: filling misses evicted keys before they were read back
+    monkeypatch.setattr(llm_processor, "_CACHE_MAX_ENTRIES", 2)
+    descriptions = ["software house", "retail store", "freight logistics", "medical clinic", "software house"]
+    
+    industries = processor.classify_industry_batch(descriptions)
+    
+    assert industries == ["Technology", "Retail", "Transportation", "Healthcare", "Technology"]
+    assert len(processor._industry_cache) == 2
+
+
+def test_cached_and_fresh_results_mix(processor, monkeypatch):
+    monkeypatch.setattr(llm_processor, "_CACHE_MAX_ENTRIES", 2)
+    processor.classify_industry_batch(["software house"])
+    
+    industries = processor.classify_industry_batch(["retail store", "software house", "medical clinic"])
+    
+    assert industries == ["Retail", "Technology", "Healthcare"]
+
+
+def test_duplicate_descriptions_classified_once(processor, monkeypatch):
+    calls = []
+    classify_with_rules = processor._classify_with_rules
+    monkeypatch.setattr(processor, "_classify_with_rules", lambda text: calls.append(text) or classify_with_rules(text))
+    
+    processor.classify_industry_batch(["Retail  Store", "retail store", "RETAIL STORE"])
+    
+    assert len(calls) == 1
\ No newline at end of file
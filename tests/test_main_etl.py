@@ -0,0 +1,120 @@
+# test_main_etl.py
+# Overlapped transform/load error handling in SGCompanyETL
+
+import threading
+from dataclasses import replace
+
+import pytest
+
+from config import config
+from main_etl import SGCompanyETL
+from models import CompanyData
+
+
+@pytest.fixture
+def etl(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "database", replace(config.database, path=str(tmp_path / "etl.db"), batches_per_commit=2))
+    monkeypatch.setattr(config, "scraping", replace(config.scraping, cache_dir=str(tmp_path / "cache")))
+    pipeline = SGCompanyETL()
+    yield pipeline
+    pipeline.db_manager.close()
+
+
+def _batches(count, size=3):
+    for b in range(count):
+        yield [CompanyData(uen=f"U{b}-{i}", company_name=f"Company {b}-{i} Pte Ltd") for i in range(size)]
+
+
+def _run_with_deadline(func, *args, timeout=10):
+    """Run func on a thread, failing the test if it hangs"""
+    outcome = {}
+    
+    def target():
+        try:
+            outcome['result'] = func(*args)
+        except BaseException as e:
+            outcome['error'] = e
+    
+    runner = threading.Thread(target=target, daemon=True)
+    runner.start()
+    runner.join(timeout)
+    assert not runner.is_alive(), "transform_and_load_phase did not return"
+    return outcome
+
+
+def test_transform_and_load_loads_every_batch(etl, monkeypatch):
+    monkeypatch.setattr(etl, "transform_phase", lambda companies: _batches(5))
+    
+    outcome = _run_with_deadline(etl.transform_and_load_phase, [])
+    
+    assert outcome == {'result': 15}
+    assert etl.db_manager.get_company_count() == 15
+
+
+def test_load_failure_does_not_deadlock_transform_worker(etl, monkeypatch):
+    # Regression: a failed load left the worker blocked on a full queue forever
+    monkeypatch.setattr(etl, "transform_phase", lambda companies: _batches(50))
+    
+    def failing_insert(batch):
+        raise RuntimeError("disk full")
+    
+    monkeypatch.setattr(etl.db_manager, "insert_companies_batch", failing_insert)
+    
+    outcome = _run_with_deadline(etl.transform_and_load_phase, [])
+    
+    assert isinstance(outcome.get('error'), RuntimeError)
+    assert not any(thread.name == "etl-transform" for thread in threading.enumerate())
+
+
+def test_transform_failure_is_raised_after_loading_earlier_batches(etl, monkeypatch):
+    def failing_transform(companies):
+        yield from _batches(1)
+        raise ValueError("bad record")
+    
+    monkeypatch.setattr(etl, "transform_phase", failing_transform)
+    
+    outcome = _run_with_deadline(etl.transform_and_load_phase, [])
+    
+    assert isinstance(outcome.get('error'), ValueError)
+    assert etl.db_manager.get_company_count() == 3
+
+def test_load_phase_does_not_hold_transaction_while_batches_are_produced(etl):
+    in_transaction_while_producing = []
+    
+    def producing_batches():
+        for batch in _batches(5):
+            in_transaction_while_producing.append(etl.db_manager.conn.in_transaction)
+            yield batch
+    
+    assert etl.load_phase(producing_batches()) == 15
+    assert in_transaction_while_producing == [False] * 5
+
+
+def _secondary_indexes(etl):
+    return {name for (name,) in etl.db_manager.conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'"
+    )}
+
+
+def test_small_top_up_keeps_indexes_and_skips_rebuild(etl, monkeypatch):
+    etl.load_phase(_batches(4), incoming_rows=12)
+    indexes = _secondary_indexes(etl)
+    monkeypatch.setattr(etl.db_manager, "drop_secondary_indexes", lambda: pytest.fail("indexes dropped"))
+    monkeypatch.setattr(etl.db_manager, "finalize_indexes", lambda: pytest.fail("indexes rebuilt"))
+    
+    assert etl.load_phase(_batches(1), incoming_rows=3) == 3
+    assert _secondary_indexes(etl) == indexes
+
+
+def test_failed_load_restores_indexes_and_keeps_original_error(etl, monkeypatch):
+    def failing_insert(batch):
+        raise RuntimeError("disk full")
+    
+    def failing_create():
+        raise RuntimeError("index build failed")
+    
+    monkeypatch.setattr(etl.db_manager, "insert_companies_batch", failing_insert)
+    monkeypatch.setattr(etl.db_manager, "create_secondary_indexes", failing_create)
+    
+    with pytest.raises(RuntimeError, match="disk full"):
+        etl.load_phase(_batches(1))
\ No newline at end of file
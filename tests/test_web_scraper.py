@@ -0,0 +1,151 @@
+# test_web_scraper.py
+# Page extraction backends, contact patterns and the HTTP revalidation cache in web_scraper
+
+import pytest
+import requests
+from bs4 import BeautifulSoup
+
+import web_scraper
+from web_scraper import (
+    WebScraper, _EMAIL_RE, _EMPLOYEE_RE, _PHONE_RE, _extract_data_from_soup, _extract_text_data,
+    _preferred_headcount
+)
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+  <title>Acme Engineering - Precision Parts</title>
+  <meta name="description" content="Precision machining and industrial automation services for Singapore manufacturers">
+</head>
+<body>
+  <h1>Acme Engineering Pte Ltd</h1>
+  <h2>Machining solutions</h2>
+  <div class="About-Us">
+    <p>Founded in 1987 and expanded in 2015, Acme serves the region.</p>
+  </div>
+  <p>Our team of 40 engineers supports more than 120 employees across three plants.</p>
+  <p>Email noreply@acme.com.sg for receipts or sales@acme.com.sg for quotes.</p>
+  <p>Call +65 61234567 or 91234567.</p>
+  <a href="https://www.facebook.com/pages/acme-old">old page</a>
+  <a href="https://www.facebook.com/acmeeng">Facebook</a>
+  <a href="https://www.linkedin.com/company/acme-engineering">LinkedIn</a>
+  <a href="https://www.instagram.com/acme.sg">Instagram</a>
+  <a href="/contact">Contact</a>
+</body>
+</html>
+"""
+
+EXPECTED = {
+    'company_name': 'Acme Engineering',
+    'services_offered': 'Precision machining and industrial automation services for Singapore manufacturers',
+    'facebook': 'https://www.facebook.com/acmeeng',
+    'linkedin': 'https://www.linkedin.com/company/acme-engineering',
+    'instagram': 'https://www.instagram.com/acme.sg',
+    'contact_email': 'sales@acme.com.sg',
+    'contact_phone': '+65 61234567',
+    'founding_year': 1987,
+    'number_of_employees': 120,
+    'keywords': 'acme, engineering, precision, parts, machining, industrial, automation, singapore, manufacturers, pte',
+}
+
+
+def _selectolax(html):
+    if not web_scraper.SELECTOLAX_AVAILABLE:
+        pytest.skip("selectolax not installed")
+    return web_scraper._extract_data_from_tree(web_scraper.LexborHTMLParser(html))
+
+
+def _lxml(html):
+    if not web_scraper.LXML_AVAILABLE:
+        pytest.skip("lxml not installed")
+    return web_scraper._extract_data_from_lxml(web_scraper.lxml.html.document_fromstring(html))
+
+
+def _soup(html):
+    return _extract_data_from_soup(BeautifulSoup(html, web_scraper._SOUP_FEATURES))
+
+
+@pytest.mark.parametrize("extract", [_selectolax, _lxml, _soup], ids=["selectolax", "lxml", "soup"])
+def test_extraction_backends_agree(extract):
+    assert extract(PAGE) == EXPECTED
+
+
+@pytest.mark.parametrize("text, email", [
+    ("Write to sales@acme.com.sg.", "sales@acme.com.sg"),
+    ("...info@acme.sg", "info@acme.sg"),  # Leading punctuation is not part of the address
+    ("tan.wei+quotes@mail.acme.com", "tan.wei+quotes@mail.acme.com"),
+    ("user@localhost", None),
+    ("no address here", None),
+])
+def test_email_pattern(text, email):
+    match = _EMAIL_RE.search(text)
+    assert (match.group(1) if match else None) == email
+
+
+def test_non_contact_addresses_are_skipped():
+    data = {}
+    _extract_text_data(data, "noreply@acme.sg or support@example.com, else hello@acme.sg", "", "")
+    assert data['contact_email'] == "hello@acme.sg"
+
+
+@pytest.mark.parametrize("text, phone", [
+    ("Call +65 61234567", "+65 61234567"),
+    ("Call +6591234567 now", "+6591234567"),
+    ("Mobile 81234567", "81234567"),
+    ("Fax 51234567", None),  # Singapore numbers start with 6, 8 or 9
+    ("1234567", None),
+])
+def test_phone_pattern(text, phone):
+    match = _PHONE_RE.search(text)
+    assert (match.group() if match else None) == phone
+
+
+@pytest.mark.parametrize("text, mentions", [
+    ("120 employees", [("120", "employees", None)]),
+    ("a team of 50 staff", [(None, None, "50"), ("50", "staff", None)]),
+    ("1000000 people visited", []),  # Longer than any plausible headcount
+])
+def test_employee_pattern(text, mentions):
+    assert [match.groups() for match in _EMPLOYEE_RE.finditer(text)] == mentions
+
+
+@pytest.mark.parametrize("headcounts, expected", [
+    ({'employees': 120, 'team': 40}, (120, True)),
+    ({'team': 40}, (40, False)),  # An "employees" mention further down would still win
+    ({'employees': 0, 'team': 40}, (40, True)),  # Implausible counts fall through
+    ({'staff': 200000}, (None, False)),
+])
+def test_preferred_headcount(headcounts, expected):
+    assert _preferred_headcount(headcounts) == expected
+
+
+class _FakeResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+    
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error")
+
+
+def test_unchanged_page_reuses_cached_data(tmp_path, monkeypatch):
+    scraper = WebScraper(cache_dir=str(tmp_path))
+    responses = [_FakeResponse(200, PAGE.encode(), {'ETag': '"v1"'}), _FakeResponse(304)]
+    sent_headers = []
+    
+    def fake_get(url, timeout, headers):
+        sent_headers.append(headers)
+        return responses.pop(0)
+    
+    monkeypatch.setattr(scraper.session, "get", fake_get)
+    first = scraper.scrape_company_website("https://www.acme.com.sg")
+    
+    monkeypatch.setattr(web_scraper, "_extract_data_from_html", lambda html: pytest.fail("page re-parsed"))
+    second = scraper.scrape_company_website("https://www.acme.com.sg")
+    
+    assert second == first
+    assert first['contact_email'] == "sales@acme.com.sg"
+    assert sent_headers == [{}, {'If-None-Match': '"v1"'}]
+    scraper.close()
\ No newline at end of file
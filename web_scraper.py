@@ -1,13 +1,63 @@
 # web_scraper.py
 # Website scraping for company information
 
+import asyncio
+import hashlib
+import json
 import re
 import time
 import logging
-from typing import Dict, Optional
+import multiprocessing
+import queue
+import threading
+import concurrent.futures
+import contextlib
+from pathlib import Path
+from typing import Dict, List, Optional
 from urllib.parse import urljoin, urlparse
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
+from tqdm import tqdm
+
+# selectolax (lexbor) builds the tree and runs the selectors in C; BeautifulSoup is the fallback
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+# lxml parses with libxml2 and answers XPath queries in C, for when selectolax is missing
+try:
+    import lxml.html
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# The BeautifulSoup fallback builds its tree from libxml2 as well when lxml is installed
+_SOUP_FEATURES = 'lxml' if LXML_AVAILABLE else 'html.parser'
+
+# orjson (de)serializes straight from/to bytes, faster than the stdlib
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    _json_loads, _json_dumps = orjson.loads, orjson.dumps
+else:
+    _json_loads, _json_dumps = json.loads, lambda obj: json.dumps(obj).encode('utf-8')
+
+# Async HTTP for batch scraping
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+    logging.warning("aiohttp not available. Batch scraping will use threads.")
 
 # Selenium imports
 try:
@@ -24,31 +74,371 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Markup that never renders as visible body text
+_BODY_RE = re.compile(rb'<body[^>]*>(.*?)(?:</body>|$)', re.I | re.S)
+_NON_TEXT_RE = re.compile(rb'<(script|style|noscript|template)\b.*?</\1\s*>|<!--.*?-->|<[^>]*>', re.I | re.S)
+
+# Rate limiting and transient server errors are retried with exponential backoff
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_RETRY_BACKOFF = 0.5  # seconds before the first retry, doubled on each further attempt
+
+# Patterns used on every scraped page
+# An address only starts where a run of address characters starts (leading punctuation is
+# skipped), so long runs without an '@' are scanned once instead of once per word boundary
+_EMAIL_RE = re.compile(r'(?<![A-Za-z0-9._%+-])[.%+-]*([A-Za-z0-9_][A-Za-z0-9._%+-]*@[A-Za-z0-9.-]+\.[A-Za-z]{2,})\b')
+_EMAIL_SKIP_RE = re.compile(r'noreply|no-reply|support@example|admin@example', re.I)  # Not contact addresses
+_PHONE_RE = re.compile(r'(?:\+65\s?)?[689]\d{7}')
+# (substring, field, excluded substring) checked in order, first hit wins, like an if/elif chain
+_SOCIAL_LINK_RULES = (
+    ('linkedin.com/company', 'linkedin', None),
+    ('linkedin.com/in', 'linkedin', None),
+    ('facebook.com', 'facebook', '/pages/'),
+    ('instagram.com', 'instagram', None),
+)
+_SOCIAL_FIELD_COUNT = len({field for _, field, _ in _SOCIAL_LINK_RULES})
+_TITLE_SUFFIX_RE = re.compile(r'\s*-\s*.*')
+_ABOUT_CLASS_RE = re.compile(r'about', re.I)
+_YEAR_RE = re.compile(r'(?:19|20)\d{2}')
+# All headcount phrasings in one scan over lowercased text. "team of" only looks ahead at
+# its number, so "team of 50 staff" also counts as a staff mention; longer digit runs than
+# any plausible headcount are not mentions at all
+_EMPLOYEE_RE = re.compile(
+    r'(?<!\d)(?P<count>\d{1,6})\s*(?P<unit>employees|staff|people)|team\s+of\s+(?=(?P<team>\d{1,6})(?!\d))'
+)
+_EMPLOYEE_PHRASINGS = ('employees', 'team', 'staff', 'people')  # Most to least preferred
+_WORD_RE = re.compile(r'\b[a-zA-Z]{3,}\b')
+_COMMON_WORDS = frozenset({'the', 'and', 'for', 'are', 'with', 'our', 'you', 'your',
+                           'company', 'business', 'service', 'services', 'solutions'})
+
+def _preferred_headcount(headcounts: Dict[str, int]):
+    """Headcount of the most preferred phrasing with a plausible value, and whether
+    mentions further down the page could still change it"""
+    final = True
+    for phrasing in _EMPLOYEE_PHRASINGS:
+        count = headcounts.get(phrasing)
+        if count is None:
+            final = False
+        elif 1 <= count <= 100000:  # Reasonable range
+            return count, final
+    return None, final
+
+def _page_needs_javascript(html: bytes) -> bool:
+    """True when the static HTML body has no text, i.e. the page is rendered client-side"""
+    body = _BODY_RE.search(html)
+    if body is None:
+        return True
+    return not _NON_TEXT_RE.sub(b'', body.group(1)).strip()
+
+# Extraction is plain module-level code with module-level patterns, so it pickles by name
+# and runs unchanged in parser worker processes
+def _extract_data_from_html(html) -> Dict:
+    """Parse raw HTML and extract data from it"""
+    if SELECTOLAX_AVAILABLE:
+        return _extract_data_from_tree(LexborHTMLParser(html))
+    if LXML_AVAILABLE:
+        try:
+            return _extract_data_from_lxml(lxml.html.document_fromstring(html))
+        except (etree.ParserError, ValueError):
+            pass  # Empty document or an encoding declaration in a str; BeautifulSoup copes
+    return _extract_data_from_soup(BeautifulSoup(html, _SOUP_FEATURES))
+
+def _extract_data_from_tree(tree) -> Dict:
+    """Extract data from a selectolax (lexbor) tree"""
+    data = {}
+    
+    # Extract company name from title or header
+    title = tree.css_first('title')
+    if title:
+        title_text = title.text().strip()
+        # Clean title text
+        title_text = _TITLE_SUFFIX_RE.sub('', title_text)
+        data['company_name'] = title_text
+    
+    # Try to find company name in h1 tags
+    if not data.get('company_name'):
+        for h1 in tree.css('h1'):
+            h1_text = h1.text().strip()
+            if len(h1_text) < 100:  # Reasonable company name length
+                data['company_name'] = h1_text
+                break
+    
+    # Extract social media links
+    _extract_social_links([link.attributes.get('href') or '' for link in tree.css('a[href]')], data)
+    
+    # Extract meta description for services/products
+    meta_desc = tree.css_first('meta[name="description"]')
+    if meta_desc and meta_desc.attributes.get('content'):
+        content = meta_desc.attributes['content'].strip()
+        if len(content) > 20:  # Meaningful description
+            data['services_offered'] = content
+    
+    # Look for about us section
+    about_section = tree.css_first('div[class*="about" i], section[class*="about" i]')
+    about_text = about_section.text().strip() if about_section else ''
+    
+    # Headings, title and meta content feed the keywords
+    keywords_text = ' '.join([elem.text() if elem.tag != 'meta'
+                              else elem.attributes.get('content') or ''
+                              for elem in tree.css('h1, h2, h3, title, meta')])
+    
+    # Visible text only, like BeautifulSoup's get_text()
+    tree.strip_tags(['script', 'style', 'template'])
+    page_text = tree.root.text() if tree.root else ''
+    
+    _extract_text_data(data, page_text, about_text, keywords_text)
+    return data
+
+def _extract_data_from_lxml(doc) -> Dict:
+    """Extract data from an lxml.html document with XPath queries"""
+    data = {}
+    
+    # Extract company name from title or header
+    titles = doc.xpath('//title')
+    if titles:
+        title_text = titles[0].text_content().strip()
+        # Clean title text
+        title_text = _TITLE_SUFFIX_RE.sub('', title_text)
+        data['company_name'] = title_text
+    
+    # Try to find company name in h1 tags
+    if not data.get('company_name'):
+        for h1 in doc.xpath('//h1'):
+            h1_text = h1.text_content().strip()
+            if len(h1_text) < 100:  # Reasonable company name length
+                data['company_name'] = h1_text
+                break
+    
+    # Extract social media links
+    _extract_social_links(doc.xpath('//a/@href'), data)
+    
+    # Extract meta description for services/products
+    meta_descs = doc.xpath('//meta[@name="description"]')
+    if meta_descs and meta_descs[0].get('content'):
+        content = meta_descs[0].get('content').strip()
+        if len(content) > 20:  # Meaningful description
+            data['services_offered'] = content
+    
+    # Look for about us section
+    about_sections = doc.xpath(
+        '//*[self::div or self::section][contains(translate(@class, "ABOUT", "about"), "about")]'
+    )
+    about_text = about_sections[0].text_content().strip() if about_sections else ''
+    
+    # Headings, title and meta content feed the keywords
+    keywords_text = ' '.join([elem.text_content() if elem.tag != 'meta'
+                              else elem.get('content') or ''
+                              for elem in doc.xpath('//h1 | //h2 | //h3 | //title | //meta')])
+    
+    # Visible text only, like BeautifulSoup's get_text()
+    etree.strip_elements(doc, 'script', 'style', 'template', with_tail=False)
+    page_text = doc.text_content()
+    
+    _extract_text_data(data, page_text, about_text, keywords_text)
+    return data
+
+def _extract_data_from_soup(soup: BeautifulSoup) -> Dict:
+    """Extract data from BeautifulSoup object"""
+    data = {}
+    
+    # Extract company name from title or header
+    title = soup.find('title')
+    if title:
+        title_text = title.get_text().strip()
+        # Clean title text
+        title_text = _TITLE_SUFFIX_RE.sub('', title_text)
+        data['company_name'] = title_text
+    
+    # Try to find company name in h1 tags
+    if not data.get('company_name'):
+        h1_tags = soup.find_all('h1')
+        for h1 in h1_tags:
+            if len(h1.get_text().strip()) < 100:  # Reasonable company name length
+                data['company_name'] = h1.get_text().strip()
+                break
+    
+    # Extract social media links
+    _extract_social_links([link['href'] for link in soup.find_all('a', href=True)], data)
+    
+    # Extract meta description for services/products
+    meta_desc = soup.find('meta', attrs={'name': 'description'})
+    if meta_desc and meta_desc.get('content'):
+        content = meta_desc.get('content', '').strip()
+        if len(content) > 20:  # Meaningful description
+            data['services_offered'] = content
+    
+    # Look for about us section
+    about_section = soup.find(['div', 'section'], class_=_ABOUT_CLASS_RE)
+    about_text = about_section.get_text().strip() if about_section else ''
+    
+    # Headings, title and meta content feed the keywords
+    important_sections = soup.find_all(['h1', 'h2', 'h3', 'title', 'meta'])
+    keywords_text = ' '.join([elem.get_text() if elem.name != 'meta' 
+                             else elem.get('content', '') 
+                             for elem in important_sections])
+    
+    _extract_text_data(data, soup.get_text(), about_text, keywords_text)
+    return data
+
+def _extract_social_links(hrefs: List[str], data: Dict):
+    """Record LinkedIn/Facebook/Instagram profile links, the last one on the page for each"""
+    found = set()
+    # Walking backwards keeps the last link per platform and stops once every platform has one
+    for link_href in reversed(hrefs):
+        href = link_href.lower()
+        for substring, field, excluded in _SOCIAL_LINK_RULES:
+            if substring in href and not (excluded and excluded in href):
+                if field not in found:
+                    found.add(field)
+                    data[field] = link_href
+                break
+        if len(found) == _SOCIAL_FIELD_COUNT:
+            break
+
+def _extract_text_data(data: Dict, page_text: str, about_text: str, keywords_text: str):
+    """Pattern-match contact details, founding year, headcount and keywords from page text"""
+    # Extract contact information (a C-level substring check skips the regex on pages with no '@');
+    # the first address that is not a common non-contact one wins, so the scan stops there
+    if '@' in page_text:
+        for match in _EMAIL_RE.finditer(page_text):
+            email = match.group(1)
+            if not _EMAIL_SKIP_RE.search(email):
+                data['contact_email'] = email
+                break
+    
+    # Extract phone numbers (only the first is kept, so stop the scan there)
+    phone = _PHONE_RE.search(page_text)
+    if phone:
+        data['contact_phone'] = phone.group()
+    
+    if about_text:
+        # Extract founding year
+        year_matches = _YEAR_RE.findall(about_text)
+        if year_matches:
+            # Get the most reasonable founding year (not too recent, not too old)
+            years = [int(year) for year in year_matches]
+            reasonable_years = [year for year in years if 1950 <= year <= 2024]
+            if reasonable_years:
+                data['founding_year'] = min(reasonable_years)  # Usually the founding year is the earliest
+    
+    # Try to extract employee count: first mention of each phrasing, preferred phrasing wins.
+    # The scan stops as soon as no later mention could change the answer
+    # Lowercased once up front, so the scan needs no case-insensitive matching
+    headcounts = {}
+    employee_count = None
+    for match in _EMPLOYEE_RE.finditer(page_text.lower()):
+        count, unit, team = match.groups()
+        phrasing = 'team' if team else unit
+        if phrasing not in headcounts:
+            headcounts[phrasing] = int(team or count)
+            employee_count, final = _preferred_headcount(headcounts)
+            if final:
+                break
+    if employee_count is not None:
+        data['number_of_employees'] = employee_count
+    
+    # Extract keywords from page content
+    # This is a simple version - LLM will do more sophisticated extraction
+    if keywords_text:
+        # First 10 distinct meaningful words (3+ characters, not common words); the scan
+        # stops there instead of tokenizing the whole text
+        unique_words = []
+        seen = set()
+        for match in _WORD_RE.finditer(keywords_text.lower()):
+            word = match.group()
+            if word in _COMMON_WORDS or word in seen:
+                continue
+            seen.add(word)
+            unique_words.append(word)
+            if len(unique_words) == 10:
+                break
+        data['keywords'] = ', '.join(unique_words)
+
+class _PageCache:
+    """Per-URL ETag/Last-Modified validators plus the data extracted from that page version"""
+    
+    def __init__(self, cache_dir: str):
+        self.cache_dir = Path(cache_dir) / "http"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    def _path(self, url: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha1(url.encode()).hexdigest()}.json"
+    
+    def load(self, url: str) -> Optional[Dict]:
+        try:
+            return _json_loads(self._path(url).read_bytes())
+        except (OSError, ValueError):
+            return None
+    
+    @staticmethod
+    def validators(entry: Optional[Dict]) -> Dict[str, str]:
+        """Conditional-GET headers for a cached entry"""
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def store(self, url: str, response_headers, data: Dict):
+        """Remember extracted data when the server gave us a way to revalidate it"""
+        etag = response_headers.get('ETag')
+        last_modified = response_headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        try:
+            self._path(url).write_bytes(
+                _json_dumps({'etag': etag, 'last_modified': last_modified, 'data': data})
+            )
+        except OSError as e:
+            logger.warning(f"Could not cache page {url}: {e}")
+
 class WebScraper:
     """Handles website scraping for company information"""
     
-    def __init__(self, headless: bool = True, use_selenium: bool = True):
+    def __init__(self, headless: bool = True, use_selenium: bool = False, cache_dir: Optional[str] = None,
+                 retry_attempts: int = 3, max_drivers: int = 2, parse_workers: int = 0):
+        # Selenium is only a fallback for pages whose static HTML has no body content;
+        # browsers are started on demand, up to max_drivers, and shared through a pool
         self.use_selenium = use_selenium and SELENIUM_AVAILABLE
-        self.driver = None
+        self.headless = headless
+        self.max_drivers = max(1, max_drivers)
+        self._drivers = []  # Every browser started, so close() can quit them all
+        self._driver_pool = queue.Queue()  # Idle browsers
+        self._driver_lock = threading.Lock()
         
-        # Regular expressions for data extraction
-        self.email_pattern = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
-        self.phone_pattern = re.compile(r'(\+65\s?)?[689]\d{7}')
+        # Unchanged pages (HTTP 304) reuse the data extracted last run instead of being re-parsed
+        self._page_cache = _PageCache(cache_dir) if cache_dir else None
+        self.retry_attempts = retry_attempts
+        
+        # Batch scraping can parse pages in worker processes, clear of the GIL (0 = worker threads)
+        self.parse_workers = parse_workers
+        self._parse_pool = None
         
         # Setup requests session
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
-        
-        if self.use_selenium:
-            self.setup_driver(headless)
+        # Pooled keep-alive connections, sized like the extractor's, so concurrent scraping
+        # threads do not open connections the pool then discards
+        retry_adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=retry_attempts, backoff_factor=_RETRY_BACKOFF,
+                status_forcelist=_RETRY_STATUSES, raise_on_status=False
+            )
+        )
+        self.session.mount('http://', retry_adapter)
+        self.session.mount('https://', retry_adapter)
     
     def setup_driver(self, headless: bool):
-        """Setup Selenium WebDriver"""
+        """Setup Selenium WebDriver; returns None if the browser cannot be started"""
         if not SELENIUM_AVAILABLE:
             logger.warning("Selenium not available, falling back to requests")
-            return
+            return None
             
         try:
             options = Options()
@@ -62,16 +452,45 @@ class WebScraper:
             options.add_experimental_option("excludeSwitches", ["enable-automation"])
             options.add_experimental_option('useAutomationExtension', False)
             
-            self.driver = webdriver.Chrome(options=options)
-            self.driver.set_page_load_timeout(30)
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            driver = webdriver.Chrome(options=options)
+            driver.set_page_load_timeout(30)
+            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
             
             logger.info("Selenium WebDriver setup successfully")
+            return driver
             
         except Exception as e:
             logger.error(f"Failed to setup WebDriver: {e}")
-            self.driver = None
             self.use_selenium = False
+            return None
+    
+    def _acquire_driver(self):
+        """Take an idle browser from the pool, starting a new one while under max_drivers"""
+        try:
+            return self._driver_pool.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._driver_lock:
+            if self.use_selenium and len(self._drivers) < self.max_drivers:
+                driver = self.setup_driver(self.headless)
+                if driver is not None:
+                    self._drivers.append(driver)
+                    return driver
+            if not self._drivers:
+                return None
+        
+        # Every browser is busy; wait for one to be released
+        return self._driver_pool.get()
+    
+    def _get_parse_pool(self) -> Optional[concurrent.futures.ProcessPoolExecutor]:
+        """Parser worker processes, started on first use; None when parsing stays in threads"""
+        if self.parse_workers > 0 and self._parse_pool is None:
+            # spawn rather than fork: the pipeline already runs logging and transform threads
+            self._parse_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.parse_workers, mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._parse_pool
     
     def scrape_company_website(self, url: str) -> Dict:
         """Scrape company information from website"""
@@ -81,10 +500,7 @@ class WebScraper:
         }
         
         try:
-            if self.use_selenium and self.driver:
-                data.update(self._scrape_with_selenium(url))
-            else:
-                data.update(self._scrape_with_requests(url))
+            data.update(self._scrape_with_requests(url))
                 
         except Exception as e:
             logger.error(f"Error scraping {url}: {e}")
@@ -95,17 +511,30 @@ class WebScraper:
         """Scrape using Selenium for JavaScript-heavy sites"""
         data = {}
         
+        driver = self._acquire_driver()
+        if driver is None:
+            return data
+        try:
+            data.update(self._render_with_selenium(driver, url))
+        finally:
+            self._driver_pool.put(driver)
+        
+        return data
+    
+    def _render_with_selenium(self, driver, url: str) -> Dict:
+        """Load url in the browser and extract data from the rendered page"""
+        data = {}
+        
         try:
-            self.driver.get(url)
+            driver.get(url)
             
             # Wait for page to load
-            WebDriverWait(self.driver, 10).until(
+            WebDriverWait(driver, 10).until(
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
             
             # Get page content
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-            data.update(self._extract_data_from_soup(soup))
+            data.update(_extract_data_from_html(driver.page_source))
             
         except TimeoutException:
             logger.warning(f"Timeout loading {url}")
@@ -119,132 +548,150 @@ class WebScraper:
         data = {}
         
         try:
-            response = self.session.get(url, timeout=15)
+            cached = self._page_cache.load(url) if self._page_cache else None
+            response = self.session.get(url, timeout=15, headers=_PageCache.validators(cached))
+            if response.status_code == 304 and cached:
+                return cached['data']
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            data.update(self._extract_data_from_soup(soup))
+            if self.use_selenium and _page_needs_javascript(response.content):
+                return self._scrape_with_selenium(url)
+            
+            data.update(_extract_data_from_html(response.content))
+            if self._page_cache:
+                self._page_cache.store(url, response.headers, data)
             
         except requests.RequestException as e:
             logger.warning(f"Request error for {url}: {e}")
             
         return data
     
-    def _extract_data_from_soup(self, soup: BeautifulSoup) -> Dict:
-        """Extract data from BeautifulSoup object"""
-        data = {}
-        
-        # Extract company name from title or header
-        title = soup.find('title')
-        if title:
-            title_text = title.get_text().strip()
-            # Clean title text
-            title_text = re.sub(r'\s*-\s*.*', '', title_text)  
-            data['company_name'] = title_text
+    def scrape_company_websites(self, urls: List[str], max_concurrency: int = 4, delay: float = 0.0,
+                                max_per_host: int = 4) -> List[Dict]:
+        """Scrape many websites concurrently; results are in the same order as urls"""
+        if not urls:
+            return []
         
-        # Try to find company name in h1 tags
-        if not data.get('company_name'):
-            h1_tags = soup.find_all('h1')
-            for h1 in h1_tags:
-                if len(h1.get_text().strip()) < 100:  # Reasonable company name length
-                    data['company_name'] = h1.get_text().strip()
-                    break
-        
-        # Get all text content for pattern matching
-        page_text = soup.get_text()
+        if not AIOHTTP_AVAILABLE:
+            def scrape_one(url: str) -> Dict:
+                data = self.scrape_company_website(url)
+                time.sleep(delay)  # Be respectful to the site
+                return data
+            
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrency) as executor, \
+                    tqdm(total=len(urls), desc="Scraping websites", unit="site", mininterval=0.5, leave=False) as progress:
+                results = []
+                for data in executor.map(scrape_one, urls):
+                    results.append(data)
+                    progress.update()
+                return results
         
-        # Extract contact information
-        emails = self.email_pattern.findall(page_text)
-        if emails:
-            # Filter out common non-contact emails
-            filtered_emails = [email for email in emails 
-                             if not any(skip in email.lower() 
-                                       for skip in ['noreply', 'no-reply', 'support@example', 'admin@example'])]
-            if filtered_emails:
-                data['contact_email'] = filtered_emails[0]
+        # Pages that turn out to be client-side rendered, re-scraped with Selenium afterwards
+        javascript_pages = set() if self.use_selenium else None
         
-        # Extract phone numbers
-        phones = self.phone_pattern.findall(page_text)
-        if phones:
-            data['contact_phone'] = phones[0]
+        async def scrape_all(progress: tqdm) -> List[Dict]:
+            semaphore = asyncio.Semaphore(max_concurrency)
+            connector = aiohttp.TCPConnector(limit=200, limit_per_host=max_per_host, ttl_dns_cache=300)
+            timeout = aiohttp.ClientTimeout(total=15)
+            
+            # Pages of one host queue on that host's own slots and reuse its pooled connections,
+            # so a site with many pages is not hit all at once and does not hold up other hosts
+            host_semaphores = {}
+            parse_pool = self._get_parse_pool()
+            
+            async def scrape_one(url: str) -> Dict:
+                host = urlparse(url).netloc.lower()
+                if host not in host_semaphores:
+                    host_semaphores[host] = asyncio.Semaphore(max_per_host)
+                data = await self._scrape_with_aiohttp(url, session, semaphore, delay, javascript_pages,
+                                                       host_semaphores[host], parse_pool)
+                progress.update()
+                return data
+            
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=self.session.headers) as session:
+                return await asyncio.gather(*[scrape_one(url) for url in urls])
         
-        # Extract social media links
-        for link in soup.find_all('a', href=True):
-            href = link['href'].lower()
-            if 'linkedin.com/company' in href or 'linkedin.com/in' in href:
-                data['linkedin'] = link['href']
-            elif 'facebook.com' in href and '/pages/' not in href:
-                data['facebook'] = link['href']
-            elif 'instagram.com' in href:
-                data['instagram'] = link['href']
+        with tqdm(total=len(urls), desc="Scraping websites", unit="site", mininterval=0.5, leave=False) as progress:
+            results = asyncio.run(scrape_all(progress))
         
-        # Extract meta description for services/products
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        if meta_desc and meta_desc.get('content'):
-            content = meta_desc.get('content', '').strip()
-            if len(content) > 20:  # Meaningful description
-                data['services_offered'] = content
+        if javascript_pages:
+            logger.info(f"Rendering {len(javascript_pages)} JavaScript-only pages with Selenium")
+            to_render = [data for data in results if data['website'] in javascript_pages]
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_drivers) as executor:
+                rendered = executor.map(self._scrape_with_selenium, [data['website'] for data in to_render])
+                for data, rendered_data in zip(to_render, rendered):
+                    data.update(rendered_data)
         
-        # Look for about us section
-        about_section = soup.find(['div', 'section'], 
-                                 class_=re.compile(r'about', re.I))
-        if about_section:
-            about_text = about_section.get_text().strip()
-            
-            # Extract founding year
-            year_matches = re.findall(r'(19|20)\d{2}', about_text)
-            if year_matches:
-                # Get the most reasonable founding year (not too recent, not too old)
-                years = [int(year) for year in year_matches]
-                reasonable_years = [year for year in years if 1950 <= year <= 2024]
-                if reasonable_years:
-                    data['founding_year'] = min(reasonable_years)  # Usually the founding year is the earliest
+        return results
+    
+    async def _scrape_with_aiohttp(self, url: str, session, semaphore: asyncio.Semaphore, delay: float,
+                                   javascript_pages: Optional[set] = None,
+                                   host_semaphore: Optional[asyncio.Semaphore] = None,
+                                   parse_pool: Optional[concurrent.futures.Executor] = None) -> Dict:
+        """Fetch one page on the event loop and parse it in a worker thread or process"""
+        data = {
+            'website': url,
+            'source_of_data': 'website_scraping'
+        }
         
-        # Try to extract employee count
-        employee_patterns = [
-            r'(\d+)\s*employees',
-            r'team\s+of\s+(\d+)',
-            r'(\d+)\s*staff',
-            r'(\d+)\s*people'
-        ]
+        cached = self._page_cache.load(url) if self._page_cache else None
+        html = None
         
-        for pattern in employee_patterns:
-            matches = re.findall(pattern, page_text, re.I)
-            if matches:
-                try:
-                    employee_count = int(matches[0])
-                    if 1 <= employee_count <= 100000:  # Reasonable range
-                        data['number_of_employees'] = employee_count
+        # Host slot first, so requests waiting on a busy host do not hold global slots
+        async with host_semaphore or contextlib.nullcontext(), semaphore:
+            try:
+                headers = _PageCache.validators(cached)
+                for attempt in range(self.retry_attempts + 1):
+                    if attempt:
+                        await asyncio.sleep(_RETRY_BACKOFF * 2 ** (attempt - 1))
+                    async with session.get(url, headers=headers) as response:
+                        if response.status in _RETRY_STATUSES and attempt < self.retry_attempts:
+                            continue
+                        if response.status == 304 and cached:
+                            data.update(cached['data'])
+                        else:
+                            response.raise_for_status()
+                            html = await response.read()
+                            response_headers = response.headers
                         break
-                except ValueError:
-                    continue
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"Request error for {url}: {e}")
+                html = None
+            except Exception as e:
+                # Never let one site fail the whole gather; it keeps its input slot
+                logger.error(f"Error scraping {url}: {e}")
+                html = None
+            
+            # Be respectful to the site before freeing the slot
+            await asyncio.sleep(delay)
         
-        # Extract keywords from page content
-        # This is a simple version - LLM will do more sophisticated extraction
-        important_sections = soup.find_all(['h1', 'h2', 'h3', 'title', 'meta'])
-        keywords_text = ' '.join([elem.get_text() if elem.name != 'meta' 
-                                 else elem.get('content', '') 
-                                 for elem in important_sections])
+        if html is not None and javascript_pages is not None and _page_needs_javascript(html):
+            # Static HTML is an empty shell; the caller renders it in the browser instead
+            javascript_pages.add(url)
+            html = None
         
-        if keywords_text:
-            # Extract meaningful words (3+ characters, not common words)
-            words = re.findall(r'\b[a-zA-Z]{3,}\b', keywords_text.lower())
-            # Filter common words
-            common_words = {'the', 'and', 'for', 'are', 'with', 'our', 'you', 'your', 
-                           'company', 'business', 'service', 'services', 'solutions'}
-            meaningful_words = [word for word in words if word not in common_words]
-            
-            # Get unique words and limit to reasonable number
-            unique_words = list(dict.fromkeys(meaningful_words))[:10]
-            data['keywords'] = ', '.join(unique_words)
+        if html is not None:
+            try:
+                # Parsing is CPU work, so keep it off the event loop
+                loop = asyncio.get_running_loop()
+                extracted = await loop.run_in_executor(parse_pool, _extract_data_from_html, html)
+                data.update(extracted)
+                if self._page_cache:
+                    self._page_cache.store(url, response_headers, extracted)
+            except Exception as e:
+                logger.error(f"Error scraping {url}: {e}")
         
         return data
     
     def close(self):
         """Clean up resources"""
-        if self.driver:
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown()
+            self._parse_pool = None
+        
+        while self._drivers:
             try:
-                self.driver.quit()
+                self._drivers.pop().quit()
             except Exception as e:
                 logger.error(f"Error closing WebDriver: {e}")
         